@@ -38,10 +38,15 @@ class ApiClient(QtCore.QObject):
         super().__init__(parent)
         self.base_url = base_url.rstrip("/")
         self.nam = QtNetwork.QNetworkAccessManager(self)
+        # 相对路径（如结果下载地址）以此为基准解析
+        self.base_qurl = QtCore.QUrl(self.base_url + "/")
         self.token = load_token()
+        self.auth_header = f"Bearer {self.token}".encode() if self.token else None
 
     def set_token(self, token: Optional[str]):
         self.token = token or None
+        # 令牌变化时才重新生成请求头，避免每个请求都编码一次
+        self.auth_header = f"Bearer {self.token}".encode() if self.token else None
         if token:
             store_token(token)
         else:
@@ -54,7 +59,9 @@ class ApiClient(QtCore.QObject):
         url = QtCore.QUrl(self.base_url + path)
         req = QtNetwork.QNetworkRequest(url)
         req.setRawHeader(b"User-Agent", f"BiSubPro/1.0".encode())
-        if self.token: req.setRawHeader(b"Authorization", f"Bearer {self.token}".encode())
+        if self.auth_header: req.setRawHeader(b"Authorization", self.auth_header)
+        # 服务端支持时走 HTTP/2，多个请求复用同一条 TLS 连接
+        req.setAttribute(QtNetwork.QNetworkRequest.Http2AllowedAttribute, True)
         return req
 
     def _do(self, method: str, path: str, payload: Optional[dict], ctx: dict):
@@ -14,6 +14,30 @@ def is_chinese(text: str) -> bool:
     return False
 
 
+def _swap_lines(content: str) -> Optional[str]:
+    """交换首尾两行；只有一行时返回 None"""
+    lines = content.lstrip('\n').rstrip('\n').split('\n')
+    if len(lines) < 2:
+        return None
+    return lines[-1] + '\n' + lines[0]
+
+
+def _chinese_line(content: str) -> Optional[str]:
+    """返回第一行中文，没有则返回 None"""
+    for line in content.lstrip('\n').rstrip('\n').split('\n'):
+        if is_chinese(line):
+            return line
+    return None
+
+
+def _other_line(content: str) -> Optional[str]:
+    """返回第一行非空的非中文内容，没有则返回 None"""
+    for line in content.lstrip('\n').rstrip('\n').split('\n'):
+        if not is_chinese(line) and line.strip():
+            return line
+    return None
+
+
 def swap_chinese_english(subtitles: List[srt.Subtitle], chinese_up: bool) -> List[srt.Subtitle]:
     """
     交换字幕中的中文和英文位置
@@ -41,21 +65,19 @@ def swap_chinese_english(subtitles: List[srt.Subtitle], chinese_up: bool) -> Lis
     swapped_all_subtitles = []
     index = 1
     for sub in subtitles:
-        tem_subcontent = sub.content.lstrip('\n').rstrip('\n').split('\n')
+        swapped = _swap_lines(sub.content)
         
         # 如果只有一行，不进行交换
-        if len(tem_subcontent) < 2:
+        if swapped is None:
             swapped_all_subtitles.append(sub)
             index += 1
             continue
         
-        second_to_up = tem_subcontent[-1]
-        first_to_down = tem_subcontent[0]
         temp_sub = srt.Subtitle(
             index=index, 
             start=sub.start, 
             end=sub.end, 
-            content=second_to_up + '\n' + first_to_down
+            content=swapped
         )
         swapped_all_subtitles.append(temp_sub)
         index += 1
@@ -80,14 +102,8 @@ def extract_chinese_only(subtitles: List[srt.Subtitle]) -> List[srt.Subtitle]:
     index = 1
     
     for sub in subtitles:
-        content_lines = sub.content.lstrip('\n').rstrip('\n').split('\n')
-        
         # 查找中文行
-        chinese_line = None
-        for line in content_lines:
-            if is_chinese(line):
-                chinese_line = line
-                break
+        chinese_line = _chinese_line(sub.content)
         
         # 如果找到中文行，创建新的字幕
         if chinese_line:
@@ -120,14 +136,8 @@ def extract_other_language_only(subtitles: List[srt.Subtitle]) -> List[srt.Subti
     index = 1
     
     for sub in subtitles:
-        content_lines = sub.content.lstrip('\n').rstrip('\n').split('\n')
-        
-        # 查找非中文行
-        other_line = None
-        for line in content_lines:
-            if not is_chinese(line) and line.strip():  # 非中文且非空
-                other_line = line
-                break
+        # 查找非中文行（非中文且非空）
+        other_line = _other_line(sub.content)
         
         # 如果找到非中文行，创建新的字幕
         if other_line:
@@ -144,6 +154,64 @@ def extract_other_language_only(subtitles: List[srt.Subtitle]) -> List[srt.Subti
 
 
 
+def snapshot_subtitles(subtitles: List[srt.Subtitle]) -> Tuple[tuple, tuple, tuple, tuple]:
+    """
+    把字幕列表拆成 (序号, 开始, 结束, 内容) 四个平行元组保存
+    
+    timedelta 和 str 都不可变，无需深拷贝即可作为原始数据长期保存；
+    切换显示模式时只需遍历内容字符串
+    """
+    if not subtitles:
+        return (), (), (), ()
+    return tuple(zip(*((sub.index, sub.start, sub.end, sub.content) for sub in subtitles)))
+
+
+def restore_subtitles(snapshot) -> List[srt.Subtitle]:
+    """从 snapshot_subtitles 的结果重建一份可修改的字幕列表"""
+    Subtitle = srt.Subtitle
+    return [Subtitle(index, start, end, content) for index, start, end, content in zip(*snapshot)]
+
+
+def display_subtitles(snapshot, mode: str) -> List[srt.Subtitle]:
+    """
+    按显示模式直接从快照生成字幕列表，结果与 swap_chinese_english / extract_* 一致
+    
+    只处理内容字符串，只为输出的行创建字幕对象
+    
+    Args:
+        snapshot: snapshot_subtitles 的结果
+        mode: chinese_up / other_up / chinese_only / other_only
+    """
+    indices, starts, ends, contents = snapshot
+    Subtitle = srt.Subtitle
+    if mode in ("chinese_up", "other_up"):
+        if not contents:
+            return []
+        # 当前顺序与期望一致时原样返回
+        if is_chinese(contents[0].lstrip('\n').split('\n')[0]) == (mode == "chinese_up"):
+            return restore_subtitles(snapshot)
+        result = []
+        for number, (index, start, end, content) in enumerate(zip(indices, starts, ends, contents), 1):
+            swapped = _swap_lines(content)
+            if swapped is None:
+                result.append(Subtitle(index, start, end, content))
+            else:
+                result.append(Subtitle(number, start, end, swapped))
+        return result
+    if mode == "chinese_only":
+        pick = _chinese_line
+    elif mode == "other_only":
+        pick = _other_line
+    else:
+        raise ValueError(f"未知的显示模式: {mode}")
+    result = []
+    for start, end, content in zip(starts, ends, contents):
+        line = pick(content)
+        if line:
+            result.append(Subtitle(len(result) + 1, start, end, line))
+    return result
+
+
 def parse_subtitle_file(filepath: str) -> Tuple[List[srt.Subtitle], str]:
     """
     解析字幕文件，支持多种格式
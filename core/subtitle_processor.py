@@ -1,18 +1,23 @@
 import os
 import re
+import copy
 import json
 import subprocess
 import pysubs2
-from PyQt5 import QtCore
+from PyQt5 import QtCore, QtGui
 
 # 正则表达式：用于匹配中文字符及全角标点
 CN_RE = re.compile(r"[\u4e00-\u9fff\u3000-\u303f\uff00-\uffef]")
+# ASS 覆盖标签 {...}、换行符 \N / \n、FFmpeg 输出中的总时长
+TAG_RE = re.compile(r"\{.*?\}")
+LINEBREAK_RE = re.compile(r"\\[Nn]|\n")
+DURATION_RE = re.compile(r"Duration: (\d{2}):(\d{2}):(\d{2}\.\d{2})")
 
 
 def get_text_weight(text):
     """辅助函数：计算文本的视觉权重（长度得分），用于挑选最长字幕"""
     if not text: return 0
-    clean_text = re.sub(r"\{.*?\}", "", text).strip()
+    clean_text = TAG_RE.sub("", text).strip()
     return sum(2 if CN_RE.search(char) or ord(char) > 127 else 1 for char in clean_text)
 
 
@@ -108,11 +113,24 @@ def smart_wrap_text(text, fontsize_factor, is_portrait=True):
 
     return r"\N".join(lines)
 
+# ffprobe 结果缓存：(路径, 修改时间, 大小) -> (宽, 高, 时长)，预览和嵌入共用
+_PROBE_CACHE = {}
+
+
 def probe_video_info(video_path: str, ffprobe_path: str) -> tuple[int, int, float]:
     """获取视频的分辨率和总时长."""
+    try:
+        st = os.stat(video_path)
+        cache_key = (video_path, st.st_mtime_ns, st.st_size)
+    except OSError:
+        cache_key = None
+    if cache_key in _PROBE_CACHE:
+        return _PROBE_CACHE[cache_key]
+
+    # 只需要首个视频流的基本信息，限制探测量，不必分析整个文件
     cmd = [
-        ffprobe_path, "-v", "error", "-select_streams", "v:0",
-        "-show_entries", "stream=width,height,duration", "-of", "json", video_path
+        ffprobe_path, "-v", "error", "-probesize", "1M", "-analyzeduration", "1M", "-select_streams", "v:0",
+        "-show_entries", "stream=width,height,duration:format=duration", "-of", "json", video_path
     ]
     try:
         startupinfo = None
@@ -124,10 +142,123 @@ def probe_video_info(video_path: str, ffprobe_path: str) -> tuple[int, int, floa
         stream = data["streams"][0]
         w = int(stream.get("width", 1920))
         h = int(stream.get("height", 1080))
-        d = float(stream.get("duration", 0.0))
-        return w, h, d
+        # mkv/webm 等容器的流上常常没有时长，退回到容器时长
+        d = float(stream.get("duration") or data.get("format", {}).get("duration") or 0.0)
     except Exception:
         return 1920, 1080, 0.0
+    # 只缓存成功的结果，失败时下次仍会重新探测
+    if cache_key is not None:
+        _PROBE_CACHE[cache_key] = (w, h, d)
+    return w, h, d
+
+
+# 按优先级排列的 H.264 编码器及其参数，最后一项为软件编码兜底
+H264_ENCODERS = [
+    ("h264_nvenc", ["-c:v", "h264_nvenc", "-preset", "p4", "-rc", "vbr", "-cq", "20", "-b:v", "0"]),
+    ("h264_qsv", ["-c:v", "h264_qsv", "-preset", "veryfast", "-global_quality", "20"]),
+    ("h264_videotoolbox", ["-c:v", "h264_videotoolbox", "-b:v", "8M"]),
+    ("h264_amf", ["-c:v", "h264_amf", "-quality", "balanced", "-rc", "cqp", "-qp_i", "20", "-qp_p", "20"]),
+    ("libx264", ["-c:v", "libx264", "-crf", "18", "-preset", "veryfast"]),
+]
+
+# 编码器探测结果缓存：ffmpeg 路径 -> 编码参数
+_ENCODER_CACHE = {}
+# 正在后台探测的 ffmpeg 路径，避免重复启动探测线程
+_ENCODER_PENDING = set()
+
+
+def detect_h264_encoder(ffmpeg_path: str) -> list:
+    """探测可用的 H.264 编码器，返回编码参数"""
+    if ffmpeg_path in _ENCODER_CACHE:
+        return _ENCODER_CACHE[ffmpeg_path]
+
+    startupinfo = None
+    if os.name == 'nt':
+        startupinfo = subprocess.STARTUPINFO()
+        startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+    try:
+        listed = subprocess.run([ffmpeg_path, "-hide_banner", "-encoders"], startupinfo=startupinfo,
+                                capture_output=True, text=True, timeout=10).stdout
+    except Exception:
+        listed = ""
+
+    result = H264_ENCODERS[-1][1]
+    for name, enc_args in H264_ENCODERS[:-1]:
+        if f" {name} " not in listed:
+            continue
+        # 编码器编译进了 ffmpeg 不代表本机有对应显卡，用一帧测试编码确认
+        try:
+            probe = subprocess.run(
+                [ffmpeg_path, "-hide_banner", "-v", "error", "-f", "lavfi",
+                 "-i", "color=c=black:s=256x256:d=0.1", "-frames:v", "1",
+                 *enc_args, "-f", "null", "-"],
+                startupinfo=startupinfo, capture_output=True, timeout=10)
+        except Exception:
+            continue
+        if probe.returncode == 0:
+            result = enc_args
+            break
+    _ENCODER_CACHE[ffmpeg_path] = result
+    return result
+
+
+class EncoderDetectWorker(QtCore.QThread):
+    """在后台线程运行 detect_h264_encoder，结果写入缓存"""
+    finished = QtCore.pyqtSignal(list)
+
+    def __init__(self, ffmpeg_path, parent=None):
+        super().__init__(parent)
+        self.ffmpeg_path = ffmpeg_path
+
+    def run(self):
+        try:
+            result = detect_h264_encoder(self.ffmpeg_path)
+        finally:
+            _ENCODER_PENDING.discard(self.ffmpeg_path)
+        self.finished.emit(result)
+
+
+def _release_encoder_worker(worker):
+    worker.wait()
+    worker.deleteLater()
+
+
+def warm_h264_encoder(ffmpeg_path, parent=None):
+    """在后台预先探测编码器（ffmpeg -encoders 加测试编码可能耗时数秒）；已缓存或正在探测时不做处理"""
+    if not ffmpeg_path or ffmpeg_path in _ENCODER_CACHE or ffmpeg_path in _ENCODER_PENDING:
+        return None
+    _ENCODER_PENDING.add(ffmpeg_path)
+    worker = EncoderDetectWorker(ffmpeg_path, parent)
+    worker.finished.connect(lambda _args, w=worker: _release_encoder_worker(w))
+    worker.start()
+    return worker
+
+
+def cached_h264_encoder(ffmpeg_path, parent=None) -> list:
+    """不阻塞地返回编码参数：探测结果未就绪时先用 libx264，同时在后台开始探测"""
+    result = _ENCODER_CACHE.get(ffmpeg_path)
+    if result is None:
+        warm_h264_encoder(ffmpeg_path, parent)
+        return H264_ENCODERS[-1][1]
+    return result
+
+
+def prefetch_file(path):
+    """提示系统提前把文件读入页缓存（仅支持 posix_fadvise 的平台，其余平台不做处理）"""
+    if not hasattr(os, "posix_fadvise"):
+        return
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        # WILLNEED 只是发起预读，立即返回，不会阻塞界面
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
 
 
 def probe_video_size(video_path: str, ffprobe_path: str) -> tuple[int, int]:
@@ -140,8 +271,8 @@ def process_bilingual_event(event, video_height, is_portrait,
                             chinese_fontsize_factor, other_fontsize_factor,
                             chinese_color="&H00C3FF", other_color="&H00FFFFFF"):
     r"""处理单个字幕行的样式和换行."""
-    clean_text = re.sub(r"\{.*?\}", "", event.text)
-    original_lines = re.split(r"\\[Nn]|\n", clean_text.strip())
+    clean_text = TAG_RE.sub("", event.text)
+    original_lines = LINEBREAK_RE.split(clean_text.strip())
 
     zh_fs = int(video_height * chinese_fontsize_factor)
     en_fs = int(video_height * other_fontsize_factor)
@@ -165,16 +296,22 @@ def process_bilingual_event(event, video_height, is_portrait,
     return event
 
 
+def load_subtitles(srt_path):
+    """读取字幕文件，先尝试 UTF-8 再回退到自动识别编码."""
+    try:
+        return pysubs2.load(srt_path, encoding="utf-8")
+    except:
+        return pysubs2.load(srt_path)
+
+
 def convert_srt_to_ass(video_path, srt_path, ass_path, ffmpeg_path, ffprobe_path,
-                       zh_factor, en_factor, margin_v, zh_color, en_color):
-    """正式嵌入转换函数."""
+                       zh_factor, en_factor, margin_v, zh_color, en_color, subs=None):
+    """正式嵌入转换函数；subs 为已解析好的字幕时不再读取文件."""
     width, height, _ = probe_video_info(video_path, ffprobe_path)
     is_portrait = height > width
 
-    try:
-        subs = pysubs2.load(srt_path, encoding="utf-8")
-    except:
-        subs = pysubs2.load(srt_path)
+    # 下面会就地修改样式和字幕行，传入的解析结果需要复制一份
+    subs = copy.deepcopy(subs) if subs is not None else load_subtitles(srt_path)
 
     # 启用填满一行模式
     subs.info["WrapStyle"] = "1"
@@ -194,16 +331,37 @@ def convert_srt_to_ass(video_path, srt_path, ass_path, ffmpeg_path, ffprobe_path
 
 def create_preview_frame(video_path, subtitle_path, output_image,
                          ffmpeg_path, ffprobe_path,
-                         zh_factor, en_factor, margin_v, zh_color, en_color) -> bool:
-    """智能预览：修复了修改边距不移动的问题."""
+                         zh_factor, en_factor, margin_v, zh_color, en_color,
+                         subs=None) -> bool:
+    """智能预览：截图保存到 output_image."""
+    data = create_preview_bytes(video_path, subtitle_path, ffmpeg_path, ffprobe_path,
+                                zh_factor, en_factor, margin_v, zh_color, en_color,
+                                subs=subs)
+    if not data:
+        return False
+    try:
+        with open(output_image, "wb") as f:
+            f.write(data)
+    except OSError:
+        return False
+    return True
+
+
+def create_preview_bytes(video_path, subtitle_path,
+                         ffmpeg_path, ffprobe_path,
+                         zh_factor, en_factor, margin_v, zh_color, en_color,
+                         subs=None, out_size=None) -> bytes:
+    """智能预览：修复了修改边距不移动的问题；
+    out_size=(宽, 高) 时输出缩小到该尺寸以内的图片，返回 JPEG 数据."""
     try:
         width, height, duration = probe_video_info(video_path, ffprobe_path)
         is_portrait = height > width
-        try:
-            subs = pysubs2.load(subtitle_path)
-        except:
-            return False
-        if not subs.events: return False
+        if subs is None:
+            try:
+                subs = pysubs2.load(subtitle_path)
+            except:
+                return b""
+        if not subs.events: return b""
 
         # 挑出内容最长的一句字幕预览
         target_sub = max(subs.events, key=lambda e: get_text_weight(e.text))
@@ -235,22 +393,85 @@ def create_preview_frame(video_path, subtitle_path, output_image,
         preview_subs.save(temp_ass)
 
         # 使用相对文件名配合 setWorkingDirectory 避开路径转义问题
-        args = ["-y", "-ss", str(seek_timestamp), "-i", video_path,
-                "-vf", f"ass='{os.path.basename(temp_ass)}'", "-frames:v", "1", output_image]
-
-        from PyQt5.QtCore import QProcess, QEventLoop
-        proc = QProcess()
+        # -ss 放在 -i 之前：按索引直接跳到关键帧，耗时与截图位置无关
+        # 截图通过 stdout 直接返回，不落盘；-q:v 3 约相当于 85 质量的 JPEG
+        # 先按原分辨率渲染字幕再整体缩放，字幕效果与正式嵌入一致
+        vf = f"ass='{os.path.basename(temp_ass)}'"
+        if out_size:
+            vf += f",scale={out_size[0]}:{out_size[1]}:force_original_aspect_ratio=decrease"
+        args = ["-y", "-v", "error", "-ss", str(seek_timestamp), "-i", video_path,
+                "-vf", vf, "-frames:v", "1",
+                "-f", "image2pipe", "-c:v", "mjpeg", "-q:v", "3", "pipe:1"]
+
+        proc = QtCore.QProcess()
         proc.setWorkingDirectory(video_dir)
         proc.start(ffmpeg_path, args)
-        loop = QEventLoop()
+        loop = QtCore.QEventLoop()
         proc.finished.connect(loop.quit)
         QtCore.QTimer.singleShot(15000, loop.quit)
         loop.exec_()
 
+        ok = proc.state() == QtCore.QProcess.NotRunning and proc.exitCode() == 0
+        if not ok:
+            proc.kill()
+            proc.waitForFinished(1000)
+        data = proc.readAllStandardOutput().data() if ok else b""
         if os.path.exists(temp_ass): os.remove(temp_ass)
-        return os.path.exists(output_image) and os.path.getsize(output_image) > 0
+        return data
     except:
-        return False
+        return b""
+
+
+class PreviewWorker(QtCore.QThread):
+    """在后台线程生成并解码预览帧，避免 FFmpeg 运行和图片解码期间界面卡住"""
+    # (JPEG 数据, 按 target_size（物理像素）缩放解码好的 QImage)
+    finished = QtCore.pyqtSignal(bytes, object)
+    error = QtCore.pyqtSignal(str)
+
+    def __init__(self, video_path, subtitle_path, ffmpeg_path, ffprobe_path,
+                 zh_factor, en_factor, margin_v, zh_color, en_color, subs=None,
+                 target_size=None, out_size=None, parent=None):
+        super().__init__(parent)
+        self._args = (video_path, subtitle_path, ffmpeg_path, ffprobe_path,
+                      zh_factor, en_factor, margin_v, zh_color, en_color)
+        self._subs = subs
+        self._target_size = target_size
+        self._out_size = out_size
+
+    def run(self):
+        try:
+            data = create_preview_bytes(*self._args, subs=self._subs, out_size=self._out_size)
+            if data:
+                # QImage 可以在非界面线程使用，转成 QPixmap 留给界面线程
+                image = QtGui.QImage()
+                buf = QtCore.QBuffer()
+                buf.setData(data)
+                buf.open(QtCore.QIODevice.ReadOnly)
+                reader = QtGui.QImageReader(buf, b"jpg")
+                size = reader.size()
+                if self._target_size is not None and size.isValid():
+                    reader.setScaledSize(size.scaled(self._target_size, QtCore.Qt.KeepAspectRatio))
+                    image = reader.read()
+                self.finished.emit(data, image)
+            else:
+                self.error.emit("预览生成失败")
+        except Exception as e:
+            self.error.emit(str(e))
+
+
+class SubtitleLoadWorker(QtCore.QThread):
+    """在后台线程解析字幕文件，供预览和嵌入复用"""
+    finished = QtCore.pyqtSignal(object)
+
+    def __init__(self, srt_path, parent=None):
+        super().__init__(parent)
+        self.srt_path = srt_path
+
+    def run(self):
+        try:
+            self.finished.emit(load_subtitles(self.srt_path))
+        except Exception:
+            self.finished.emit(None)
 
 
 class SubtitleEmbedder(QtCore.QObject):
@@ -266,39 +487,67 @@ class SubtitleEmbedder(QtCore.QObject):
         self.proc.readyReadStandardOutput.connect(self._on_output)
         self.proc.finished.connect(self._on_finished)
         self._duration_sec = 0
+        self._last_percent = -1
+        self._out_buf = b""
 
-    def embed(self, video_path, srt_path, output_path, zh_factor, en_factor, margin, zh_col, en_col):
+    def embed(self, video_path, srt_path, output_path, zh_factor, en_factor, margin, zh_col, en_col,
+              subs=None, enc_args=None, threads=0):
         self._output_video = output_path
-        self._duration_sec = 0
+        # 时长优先用（已缓存的）ffprobe 结果，拿不到时再从 FFmpeg 输出里解析
+        self._duration_sec = probe_video_info(video_path, self.ffprobe_path)[2]
+        self._last_percent = -1
+        self._out_buf = b""
         video_dir = os.path.dirname(os.path.abspath(video_path))
-        self._temp_ass = os.path.join(video_dir, f".tmp_{os.getpid()}.ass")
+        # 文件名带上实例 id，批量嵌入时同一目录下的多个任务互不覆盖
+        self._temp_ass = os.path.join(video_dir, f".tmp_{os.getpid()}_{id(self):x}.ass")
 
         try:
             convert_srt_to_ass(video_path, srt_path, self._temp_ass, self.ffmpeg_path, self.ffprobe_path,
-                               zh_factor, en_factor, margin, zh_col, en_col)
+                               zh_factor, en_factor, margin, zh_col, en_col, subs=subs)
         except Exception as e:
             self.error.emit(str(e));
             return
 
         # -nostdin 解决 FFmpeg 挂起卡死问题
-        args = ["-y", "-nostdin", "-i", video_path, "-vf", f"ass='{os.path.basename(self._temp_ass)}'",
-                "-c:v", "libx264", "-crf", "18", "-preset", "veryfast", "-c:a", "copy", "-sn", output_path]
+        # -progress pipe:1 输出 key=value 形式的进度，-nostats 去掉 stderr 上的 time= 刷屏
+        # enc_args 为 detect_h264_encoder 的结果，不传时使用软件编码
+        enc_args = enc_args or H264_ENCODERS[-1][1]
+        # 使用硬件编码时同时尝试硬件解码（解码帧回到内存，字幕滤镜照常工作）
+        hwaccel = [] if enc_args[1] == "libx264" else ["-hwaccel", "auto"]
+        args = ["-y", "-nostdin", "-progress", "pipe:1", "-nostats",
+                *hwaccel, "-i", video_path, "-vf", f"ass='{os.path.basename(self._temp_ass)}'",
+                *enc_args, "-c:a", "copy", "-sn"]
+        # threads > 0 时限制编码线程数，多个任务并行时避免抢占 CPU
+        if threads > 0:
+            args += ["-threads", str(threads)]
+        args.append(output_path)
 
         self.proc.setWorkingDirectory(video_dir)
         self.proc.start(self.ffmpeg_path, args)
 
     def _on_output(self):
-        out = self.proc.readAllStandardOutput().data().decode("utf-8", errors="ignore")
-        if self._duration_sec == 0:
-            m = re.search(r"Duration: (\d{2}):(\d{2}):(\d{2}\.\d{2})", out)
-            if m: h, m, s = map(float, m.groups()); self._duration_sec = h * 3600 + m * 60 + s
-
-        # 正确的进度正则
-        tm = re.search(r"time=(\d{2}):(\d{2}):(\d{2}\.\d{2})", out)
-        if tm and self._duration_sec > 0:
-            h, m, s = map(float, tm.groups())
-            p = int(((h * 3600 + m * 60 + s) / self._duration_sec) * 100)
-            self.progress.emit(min(p, 98))  # 进度条平滑锁定在 98% 等待收尾
+        # 按整行处理，半行留到下次读取时拼接
+        data = self._out_buf + self.proc.readAllStandardOutput().data()
+        lines = data.split(b"\n")
+        self._out_buf = lines.pop()
+        for raw in lines:
+            line = raw.decode("utf-8", errors="ignore").strip()
+            if self._duration_sec == 0:
+                m = DURATION_RE.search(line)
+                if m: h, m, s = map(float, m.groups()); self._duration_sec = h * 3600 + m * 60 + s
+
+            # out_time_us 与 out_time_ms 的单位都是微秒（后者是 FFmpeg 的历史命名）
+            key, _, value = line.partition("=")
+            if key in ("out_time_us", "out_time_ms") and self._duration_sec > 0:
+                try:
+                    sec = int(value) / 1000000.0
+                except ValueError:
+                    continue
+                p = min(int(sec / self._duration_sec * 100), 98)  # 进度条平滑锁定在 98% 等待收尾
+                # 百分比变化时才发信号，减少跨线程刷新
+                if p > self._last_percent:
+                    self._last_percent = p
+                    self.progress.emit(p)
 
     def _on_finished(self, code):
         if hasattr(self, '_temp_ass') and os.path.exists(self._temp_ass):
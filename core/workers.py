@@ -5,6 +5,7 @@ import subprocess
 import yt_dlp
 from PyQt5 import QtCore
 from config.settings import WORK_DIR
+from core.subtitle_editor_logic import parse_subtitle_file, snapshot_subtitles, save_subtitle_file, create_backup
 
 
 class FFmpegAudioWorker(QtCore.QObject):
@@ -167,6 +168,7 @@ class VideoDownloadWorker(QtCore.QThread):
         self.url = url
         self.output_dir = output_dir
         self.ffmpeg_path = ffmpeg_path
+        self._last_percent = -1
 
     def _get_format_by_duration(self, duration_str):
         """
@@ -347,6 +349,57 @@ class VideoDownloadWorker(QtCore.QThread):
         if d['status'] == 'downloading':
             total = d.get('total_bytes') or d.get('total_bytes_estimate')
             if total:
-                self.progress.emit(int(d.get('downloaded_bytes', 0) / total * 100))
+                # yt-dlp 每个分块都会回调，只有百分比变化时才跨线程发信号
+                percent = int(d.get('downloaded_bytes', 0) / total * 100)
+                if percent != self._last_percent:
+                    self._last_percent = percent
+                    self.progress.emit(percent)
         elif d['status'] == 'finished':
-            self.log.emit("下载完成，正在合并/处理...")
\ No newline at end of file
+            self.log.emit("下载完成，正在合并/处理...")
+
+
+class SubtitleParseWorker(QtCore.QThread):
+    """在后台线程解析字幕编辑器打开的文件，避免大文件卡住界面"""
+    finished = QtCore.pyqtSignal(list, str, object)  # 字幕列表, 格式, 原始数据快照
+    error = QtCore.pyqtSignal(str)
+
+    def __init__(self, filepath: str, parent=None):
+        super().__init__(parent)
+        self.filepath = filepath
+
+    def run(self):
+        try:
+            subtitles, fmt = parse_subtitle_file(self.filepath)
+            self.finished.emit(subtitles, fmt, snapshot_subtitles(subtitles))
+        except Exception as e:
+            self.error.emit(str(e))
+
+
+class SubtitleSaveWorker(QtCore.QThread):
+    """在后台线程备份并保存字幕文件"""
+    finished = QtCore.pyqtSignal(str, str)  # 保存路径, 备份路径（未备份为空）
+    error = QtCore.pyqtSignal(str, bool)    # 错误信息, 是否在备份阶段出错
+
+    def __init__(self, subtitles, source_path: str, save_path: str, save_format: str,
+                 backup: bool = True, parent=None):
+        super().__init__(parent)
+        self.subtitles = subtitles
+        self.source_path = source_path
+        self.save_path = save_path
+        self.save_format = save_format
+        self.backup = backup
+
+    def run(self):
+        backup_path = ""
+        if self.backup:
+            try:
+                backup_path = create_backup(self.source_path)
+            except Exception as e:
+                self.error.emit(str(e), True)
+                return
+        try:
+            save_subtitle_file(self.subtitles, self.save_path, self.save_format)
+        except Exception as e:
+            self.error.emit(str(e), False)
+            return
+        self.finished.emit(self.save_path, backup_path)
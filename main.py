@@ -1,23 +1,35 @@
 import os
 import sys
+import re
+import copy
 import json
+import time
 import uuid
+import subprocess
 import requests
 import webbrowser
+from urllib.parse import urlparse, unquote
+from urllib.request import url2pathname
 from core.workers import VideoDownloadWorker
 from typing import Dict, Optional
-from dataclasses import dataclass
-from packaging import version  # 需要运行: pip install packaging
 from PyQt5 import QtCore, QtGui, QtWidgets, QtNetwork
 from PyQt5.QtGui import QDesktopServices
-from PyQt5.QtCore import QUrl
+from PyQt5.QtCore import QUrl, QFile, QProcess
+from PyQt5.QtNetwork import QNetworkRequest
 from config.settings import load_config, save_config, DEFAULT_API_BASE, CURRENT_VERSION, UPDATE_URL, DOWNLOAD_VIDEO_DIR, \
-    DOWNLOAD_DIR
+    DOWNLOAD_DIR, SUB_RESULT_DIR, VIDEO_RESULT_DIR
 from config.theme import apply_business_theme
-from core.api_client import ApiClient
+from core.api_client import ApiClient, UserState
 from ui.components import LoginDialog, notify
 from ui.pages import UploadPage, DownloadPage, BillingPage, SettingsPage, SubtitleEditorPage
 from ui.embed_page import EmbedSubtitlesPage
+from core.subtitle_processor import cached_h264_encoder, probe_video_info, warm_h264_encoder
+
+try:
+    import pysubs2
+    HAS_PYSUBS2 = True
+except ImportError:
+    HAS_PYSUBS2 = False
 
 # --- robust base dir (works in dev & PyInstaller) ---
 BASE_DIR = getattr(sys, "_MEIPASS", os.path.dirname(os.path.abspath(__file__)))
@@ -45,13 +57,20 @@ RESOURCES_DIR = _detect_resources_dir()
 DEFAULT_FFMPEG_PATH = os.path.join(RESOURCES_DIR, "bin", "ffmpeg.exe")
 #DEFAULT_FFMPEG_PATH = "C:/ProgramData/miniconda3/envs/nicksub/Library/bin/ffmpeg.exe"
 
-@dataclass
-class UserState:
-    phone: Optional[str] = None
-    email: Optional[str] = None
-    display_name: str = ""
-    minutes_left: int = 0
+# ffmpeg 进度输出中的时间戳（字节模式，无需先解码）
+_TIME_RE = re.compile(rb"time=(\d+):(\d+):(\d+\.?\d*)")
+
+# 生成 ASS 时用到的正则：去除样式标签、拆分换行、识别中文
+_CURLY_RE = re.compile(r"\{.*?\}")
+_LINEBREAK_RE = re.compile(r"\\[Nn]|\n")
+_CN_RE = re.compile(r"[\u4e00-\u9fff]")
+
+# 文件名中的非法字符（含控制字符）统一替换为下划线
+_FN_BAD = dict.fromkeys(map(ord, '<>:"/\\|?*'), ord('_'))
+_FN_BAD.update(dict.fromkeys(range(0x20), ord('_')))
 
+# 已解析的字幕文件缓存：(路径, 修改时间) -> SSAFile，重复烧录同一字幕时免去重新解析
+_SUBS_CACHE = {}
 
 # Global variables (would be better in a class)
 CONFIG = {}
@@ -59,18 +78,37 @@ API_CLIENT = None
 MAIN_WINDOW = None
 
 
+def _version_tuple(text: str) -> tuple:
+    """纯数字版本号转元组，去掉末尾的 0（与 packaging 一致，1.2 与 1.2.0 视为相同）"""
+    parts = list(map(int, text.split(".")))
+    while len(parts) > 1 and parts[-1] == 0:
+        parts.pop()
+    return tuple(parts)
+
+
+def _is_newer_version(latest: str, current: str) -> bool:
+    """比较版本号，常见的 X.Y.Z 纯数字格式直接用元组比较"""
+    try:
+        return _version_tuple(latest) > _version_tuple(current)
+    except ValueError:
+        # 带后缀的版本号（如 1.2.3rc1）才需要 packaging
+        from packaging import version  # 需要运行: pip install packaging
+        return version.parse(latest) > version.parse(current)
+
+
 class UpdateChecker(QtCore.QThread):
     update_available = QtCore.pyqtSignal(str, str)  # version, url
     error_occurred = QtCore.pyqtSignal(str)  # 错误信息
 
     def run(self):
         try:
-            # 检查是否是本地文件URL
-            if UPDATE_URL.startswith("file:///"):
-                # 读取本地文件
-                file_path = UPDATE_URL[8:].replace("/", "\\")  # 移除"file:///"前缀并转换路径分隔符
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
+            # 检查是否是本地文件URL（常见的 http/https 地址无需解析，直接走网络请求）
+            parsed = None if UPDATE_URL.startswith(("http://", "https://")) else urlparse(UPDATE_URL)
+            if parsed is not None and parsed.scheme == "file":
+                # 读取本地文件，由 url2pathname 负责转换路径格式（含百分号编码）
+                file_path = url2pathname(parsed.path)
+                with open(file_path, 'rb') as f:
+                    data = json.loads(f.read())
             else:
                 # 发送HTTP请求获取版本信息
                 response = requests.get(UPDATE_URL, timeout=5)
@@ -83,7 +121,7 @@ class UpdateChecker(QtCore.QThread):
             update_notes = data.get("message", "")  # 修正字段名
 
             # 检查版本号
-            if latest_version and version.parse(latest_version) > version.parse(CURRENT_VERSION):
+            if latest_version and _is_newer_version(latest_version, CURRENT_VERSION):
                 # 检查是否跳过了此版本
                 from config.settings import load_config
                 config = load_config()
@@ -104,6 +142,7 @@ class UpdateChecker(QtCore.QThread):
 
     def download_update(self, download_url, progress_callback=None):
         """下载更新文件"""
+        filepath = None
         try:
             # 获取下载目录
             os.makedirs(DOWNLOAD_DIR, exist_ok=True)
@@ -120,6 +159,10 @@ class UpdateChecker(QtCore.QThread):
             downloaded_size = 0
 
             with open(filepath, 'wb') as f:
+                # 已知文件大小时预先分配空间，减少写入过程中的文件系统元数据更新和碎片
+                if total_size > 0:
+                    f.truncate(total_size)
+                    f.seek(0)
                 for chunk in response.iter_content(chunk_size=8192):
                     if chunk:
                         f.write(chunk)
@@ -130,19 +173,60 @@ class UpdateChecker(QtCore.QThread):
                             result = progress_callback(progress)
                             # 如果回调返回False，则取消下载
                             if result is False:
-                                # 清理已下载的文件
-                                if os.path.exists(filepath):
-                                    try:
-                                        os.remove(filepath)
-                                    except:
-                                        pass
                                 raise Exception("下载已被用户取消")
 
+            # 实际收到的字节数与声明的大小不符，说明下载不完整
+            if total_size > 0 and downloaded_size != total_size:
+                raise Exception(f"文件不完整（{downloaded_size}/{total_size} 字节）")
+
             return filepath
         except Exception as e:
+            # 删除未完成或预分配后残留的安装包，避免留下补零的文件
+            if filepath and os.path.exists(filepath):
+                try:
+                    os.remove(filepath)
+                except OSError:
+                    pass
             raise Exception(f"下载更新失败: {str(e)}")
 
 
+class DownloadThread(QtCore.QThread):
+    """在后台线程中下载更新安装包"""
+    progress = QtCore.pyqtSignal(int)
+    finished = QtCore.pyqtSignal(str)
+    error = QtCore.pyqtSignal(str)
+
+    def __init__(self, update_checker, download_url):
+        super().__init__()
+        self.update_checker = update_checker
+        self.download_url = download_url
+        self._canceled = False
+
+    def cancel(self):
+        """取消下载"""
+        self._canceled = True
+
+    def run(self):
+        try:
+            # 修改download_update方法以支持进度回调中检查取消状态
+            filepath = self.update_checker.download_update(
+                self.download_url,
+                lambda p: self.progress.emit(p) if not self._canceled else None
+            )
+            if not self._canceled:
+                self.finished.emit(filepath)
+            else:
+                # 清理已下载的文件
+                if os.path.exists(filepath):
+                    try:
+                        os.remove(filepath)
+                    except:
+                        pass
+        except Exception as e:
+            if not self._canceled:
+                self.error.emit(str(e))
+
+
 class MainWindow(QtWidgets.QMainWindow):
     def __init__(self):
         super().__init__()
@@ -158,6 +242,16 @@ class MainWindow(QtWidgets.QMainWindow):
         self._current_user_info = {}
         # 初始化账户信息等待标志
         self._waiting_for_account_info = False
+        # 上次请求 /me 的时间，用于合并短时间内的重复请求
+        self._me_last_ts = 0.0
+        # 上传/烧录的高频进度先记下，由 10Hz 定时器统一刷新到进度条
+        self._pending_progress = None
+        self._progressTimer = QtCore.QTimer(self)
+        self._progressTimer.setInterval(100)
+        self._progressTimer.timeout.connect(self._flush_progress)
+        # 烧录进程对象常驻复用；启动后空闲时先跑一次 ffmpeg -version 预热
+        self._burnProc = None
+        QtCore.QTimer.singleShot(1000, self._prewarm_ffmpeg)
         global API_CLIENT, MAIN_WINDOW
         API_CLIENT = self.api_client
         MAIN_WINDOW = self
@@ -254,7 +348,7 @@ class MainWindow(QtWidgets.QMainWindow):
         # Page signals
         self.upload_page.start_task.connect(self._start_translation_task)
         self.download_page.start_download.connect(self._start_download)
-        self.download_page.sync_btn.clicked.connect(self._sync_cookies)
+        self.download_page.sync_cookies.connect(self._sync_cookies)
         self.billing_page.purchase_minutes.connect(self._purchase_minutes)
         self.settings_page.settings_changed.connect(self._on_settings_changed)
 
@@ -264,6 +358,7 @@ class MainWindow(QtWidgets.QMainWindow):
 
     def _login(self):
         dialog = LoginDialog(self.api_client, self)
+        dialog.authed.connect(self._save_credentials)
         dialog.authed.connect(self._on_login_success)
         dialog.exec_()
 
@@ -279,9 +374,21 @@ class MainWindow(QtWidgets.QMainWindow):
             self.billing_page.set_user(None)
         notify(self, "已退出登录")
 
+    def _refresh_me(self, force: bool = False):
+        """请求最新用户信息，0.5 秒内的重复请求会被合并"""
+        now = time.monotonic()
+        if not force and now - self._me_last_ts < 0.5:
+            return
+        self._me_last_ts = now
+        self.api_client.me()
+
+    def _save_credentials(self, info: dict):
+        """把登录使用的手机号/邮箱保存到配置"""
+        self.config.update(info)
+
     def _on_login_success(self, info=None):
         # 从API获取最新的用户信息和分钟数
-        self.api_client.me()
+        self._refresh_me()
 
     def _on_account(self):
         if not self.api_client.token:
@@ -289,8 +396,8 @@ class MainWindow(QtWidgets.QMainWindow):
             return
         # 设置标志位，表示正在等待账户信息
         self._waiting_for_account_info = True
-        # 从API获取最新的用户信息
-        self.api_client.me()
+        # 从API获取最新的用户信息（必须真正发出请求，否则账户对话框不会弹出）
+        self._refresh_me(force=True)
 
     def _show_account_dialog(self, ident, minutes_left):
         box = QtWidgets.QMessageBox(self)
@@ -307,12 +414,12 @@ class MainWindow(QtWidgets.QMainWindow):
             self._login()
         elif clicked == refresh_btn:
             # 调用API刷新余额
-            self.api_client.me()
+            self._refresh_me(force=True)
             notify(self, "余额已刷新")
 
     def _refresh_account_status(self):
         # 从API获取用户信息
-        self.api_client.me()
+        self._refresh_me()
         # 模拟获取用户配额信息
         minutes_left = self.config.get("minutes_left", 0)
         self.quota_label.setText(f"分钟: {minutes_left}")
@@ -362,12 +469,22 @@ class MainWindow(QtWidgets.QMainWindow):
         progress_dialog.show()
 
         # 在单独的线程中下载更新
+        last_pct = -1
+        last_cancel_check = 0.0
+
         def download_progress(progress):
-            # 检查用户是否取消了下载
-            if progress_dialog.wasCanceled():
-                # 返回False表示取消下载
-                return False
-            progress_dialog.setValue(progress)
+            nonlocal last_pct, last_cancel_check
+            # 检查用户是否取消了下载（最多每 250ms 查询一次）
+            now = time.monotonic()
+            if now - last_cancel_check >= 0.25:
+                last_cancel_check = now
+                if progress_dialog.wasCanceled():
+                    # 返回False表示取消下载
+                    return False
+            # 百分比没有变化时不刷新进度条
+            if progress != last_pct:
+                last_pct = progress
+                progress_dialog.setValue(progress)
             # 返回True表示继续下载
             return True
 
@@ -406,43 +523,6 @@ class MainWindow(QtWidgets.QMainWindow):
                 QtWidgets.QMessageBox.critical(self, "下载失败", f"更新下载失败：{error_msg}")
 
         # 启动下载
-        from PyQt5.QtCore import QThread, pyqtSignal
-
-        class DownloadThread(QThread):
-            progress = pyqtSignal(int)
-            finished = pyqtSignal(str)
-            error = pyqtSignal(str)
-
-            def __init__(self, update_checker, download_url):
-                super().__init__()
-                self.update_checker = update_checker
-                self.download_url = download_url
-                self._canceled = False
-
-            def cancel(self):
-                """取消下载"""
-                self._canceled = True
-
-            def run(self):
-                try:
-                    # 修改download_update方法以支持进度回调中检查取消状态
-                    filepath = self.update_checker.download_update(
-                        self.download_url,
-                        lambda p: self.progress.emit(p) if not self._canceled else None
-                    )
-                    if not self._canceled:
-                        self.finished.emit(filepath)
-                    else:
-                        # 清理已下载的文件
-                        if os.path.exists(filepath):
-                            try:
-                                os.remove(filepath)
-                            except:
-                                pass
-                except Exception as e:
-                    if not self._canceled:
-                        self.error.emit(str(e))
-
         # 创建并启动下载线程
         self.download_thread = DownloadThread(self.update_checker, download_url)
         self.download_thread.progress.connect(download_progress)
@@ -565,8 +645,7 @@ class MainWindow(QtWidgets.QMainWindow):
 
     def _safe_filename(self, filename: str) -> str:
         """安全的文件名"""
-        import re
-        return re.sub(r'[<>:"/\\|?*\x00-\x1F]', '_', filename)
+        return filename.translate(_FN_BAD)
 
     def _probe_video_size(self, video_path: str) -> tuple:
         """探测视频尺寸（宽和高）"""
@@ -603,6 +682,7 @@ class MainWindow(QtWidgets.QMainWindow):
     def _audio_err(self, video_path: str, error: str):
         """音频提取失败的回调"""
         self.upload_page.setStep(f"音频提取失败：{error}")
+        self.upload_page.flush_log()
         self._busy = False
         self.upload_page.startBtn.setEnabled(True)
         self.upload_page.videoBtn.setEnabled(True)
@@ -612,8 +692,7 @@ class MainWindow(QtWidgets.QMainWindow):
     def _start_download(self, url):
 
         self.download_page.download_btn.setEnabled(False)
-        self.download_page.progress_bar.setValue(0)
-        self.download_page.log_display.clear()
+        self.download_page.reset_progress()
         self.download_page._log("准备开始下载...")
 
         ffmpeg_path = self.config.get("ffmpeg_path", "")
@@ -633,6 +712,7 @@ class MainWindow(QtWidgets.QMainWindow):
         """下载完成的处理方法"""
         self.download_page.status_label.setText("下载成功！")
         self.download_page._log(f"文件已保存: {os.path.basename(filename)}")
+        self.download_page.flush_log()
         self.download_page.download_btn.setEnabled(True)
         notify(self, "视频下载完成")
 
@@ -640,6 +720,7 @@ class MainWindow(QtWidgets.QMainWindow):
         """下载错误的处理方法"""
         self.download_page.status_label.setText("出错")
         self.download_page._log(f"错误: {err_msg}")
+        self.download_page.flush_log()
         self.download_page.download_btn.setEnabled(True)
         QtWidgets.QMessageBox.critical(self, "下载错误", err_msg)
 
@@ -656,6 +737,9 @@ class MainWindow(QtWidgets.QMainWindow):
     def _on_settings_changed(self):
         # Save config and apply changes
         save_config(self.config)
+        ffmpeg_path = self.config.get("ffmpeg_path", "")
+        ffprobe_path = os.path.join(os.path.dirname(ffmpeg_path), "ffprobe.exe") if ffmpeg_path else ""
+        self.embed_page.update_ffmpeg_paths(ffmpeg_path, ffprobe_path)
         notify(self, "设置已保存")
 
     def _on_api(self, ctx: dict, data: dict):
@@ -712,8 +796,11 @@ class MainWindow(QtWidgets.QMainWindow):
                     self._notfound_retries = getattr(self, "_notfound_retries", 0) + 1
                     if self._notfound_retries <= 20:
                         self.upload_page.setStep("登记中…")
+                        # 登记重试用固定间隔，20 次约 60 秒，不参与退避
+                        self.pollTimer.start(3000)
                         return
                 self.upload_page.setStep(f"任务失败：{data.get('error')}")
+                self.upload_page.flush_log()
                 if hasattr(self, "pollTimer"):
                     self.pollTimer.stop()
                 self._busy = False
@@ -746,8 +833,8 @@ class MainWindow(QtWidgets.QMainWindow):
                             self._completed_jobs = {}
                         self._completed_jobs[jid] = True
                         self._download_results(jid, urls)
-                        self.api_client.me()
-                        QtCore.QTimer.singleShot(1500, lambda: self.api_client.me())
+                        self._refresh_me()
+                        QtCore.QTimer.singleShot(1500, self._refresh_me)
 
                 if hasattr(self, "pollTimer"):
                     self.pollTimer.stop()
@@ -756,15 +843,19 @@ class MainWindow(QtWidgets.QMainWindow):
                 self.upload_page.videoBtn.setEnabled(True)
                 self.upload_page.langSrc.setEnabled(True)
                 self.upload_page.langTgt.setEnabled(True)
+            else:
+                # 只按状态退避：运行中进度和消息几乎每次都变，不能用来判断
+                self._schedule_poll(status)
         elif op == "purchase_minutes":
             notify(self, "购买分钟成功")
-            self.api_client.me()  # 刷新用户信息
+            self._refresh_me()  # 刷新用户信息
 
     def _create_job_after_extract(self, audio_path: str):
         """音频提取完成后创建任务"""
         # 检查参数
         if not hasattr(self, '_pipeline_params'):
             self.upload_page.setStep("内部错误：缺少任务参数")
+            self.upload_page.flush_log()
             self._busy = False
             self.upload_page.startBtn.setEnabled(True)
             self.upload_page.videoBtn.setEnabled(True)
@@ -778,9 +869,7 @@ class MainWindow(QtWidgets.QMainWindow):
         needed_minutes = params.get("needed_minutes", 0)
 
         # 准备上传数据
-        from PyQt5.QtCore import QFile, QUrl
-        from PyQt5.QtNetwork import QHttpMultiPart, QHttpPart, QNetworkRequest
-        import uuid
+        from PyQt5.QtNetwork import QHttpMultiPart, QHttpPart
 
         # 生成客户端任务ID
         client_job_id = str(uuid.uuid4())
@@ -788,27 +877,28 @@ class MainWindow(QtWidgets.QMainWindow):
         # 创建multipart请求
         multi_part = QHttpMultiPart(QHttpMultiPart.FormDataType)
 
-        # 添加字段的辅助函数
-        def add_field(name: str, value: str):
+        # 先收集所有表单字段，再统一生成 part
+        fields = [
+            ("client_job_id", client_job_id),
+            ("video_name", os.path.basename(params["video_path"])),
+            ("lang_src", lang_src),
+            ("lang_tgt", lang_tgt),
+        ]
+        # 添加视频尺寸信息
+        if "video_width" in params and "video_height" in params:
+            fields.append(("video_width", str(params["video_width"])))
+            fields.append(("video_height", str(params["video_height"])))
+
+        for name, value in fields:
             part = QHttpPart()
-            part.setHeader(QNetworkRequest.ContentDispositionHeader, f'form-data; name="{name}"')
+            part.setRawHeader(b"Content-Disposition", b'form-data; name="%s"' % name.encode())
             part.setBody(value.encode())
             multi_part.append(part)
 
-        # 添加必需的参数
-        add_field("client_job_id", client_job_id)
-        add_field("video_name", os.path.basename(params["video_path"]))
-        add_field("lang_src", lang_src)
-        add_field("lang_tgt", lang_tgt)
-        
-        # 添加视频尺寸信息
-        if "video_width" in params and "video_height" in params:
-            add_field("video_width", str(params["video_width"]))
-            add_field("video_height", str(params["video_height"]))
-
         # 添加音频文件
+        # 以无缓冲模式打开，QHttpMultiPart 发送时按需从磁盘读取，不会在内存中保留整个文件
         audio_file = QFile(audio_path)
-        if not audio_file.open(QFile.ReadOnly):
+        if not audio_file.open(QFile.ReadOnly | QFile.Unbuffered):
             self.upload_page.setStep("无法读取音频文件")
             self._busy = False
             self.upload_page.startBtn.setEnabled(True)
@@ -833,8 +923,11 @@ class MainWindow(QtWidgets.QMainWindow):
         request = QNetworkRequest(url)
         # 设置User-Agent头部
         request.setRawHeader(b"User-Agent", b"BiSubPro/1.0")
-        if self.api_client.token:
-            request.setRawHeader(b"Authorization", f"Bearer {self.api_client.token}".encode())
+        # 上传过程中 60 秒没有任何数据传输则视为超时（需要 Qt 5.15+）
+        if hasattr(request, "setTransferTimeout"):
+            request.setTransferTimeout(60000)
+        if self.api_client.auth_header:
+            request.setRawHeader(b"Authorization", self.api_client.auth_header)
 
         self._currentUploadReply = self.api_client.nam.post(request, multi_part)
         multi_part.setParent(self._currentUploadReply)  # 让reply拥有multi_part
@@ -844,7 +937,7 @@ class MainWindow(QtWidgets.QMainWindow):
         self._current_job_id = None
 
         self._currentUploadReply.uploadProgress.connect(
-            lambda sent, total: self.upload_page.setProgress(int(sent / total * 50) if total > 0 else 0)
+            lambda sent, total: self._queue_progress(int(sent / total * 50) if total > 0 else 0)
         )
         self._currentUploadReply.finished.connect(lambda: self._on_upload_finished(self._currentUploadReply))
 
@@ -853,6 +946,7 @@ class MainWindow(QtWidgets.QMainWindow):
 
     def _on_upload_finished(self, reply):
         """处理上传完成的回调"""
+        self._pending_progress = None
         try:
             if getattr(self, "_upload_file", None):
                 self._upload_file.close()
@@ -864,6 +958,7 @@ class MainWindow(QtWidgets.QMainWindow):
         status = reply.attribute(QtNetwork.QNetworkRequest.HttpStatusCodeAttribute)
         if status and int(status) >= 400:
             self.upload_page.setStep(f"上传失败：HTTP {int(status)}")
+            self.upload_page.flush_log()
             self._busy = False
             self.upload_page.startBtn.setEnabled(True)
             self.upload_page.videoBtn.setEnabled(True)
@@ -891,11 +986,15 @@ class MainWindow(QtWidgets.QMainWindow):
 
         if real_jid:
             self._pending_client_job_id = None
+            # 轮询间隔自适应：每次收到结果后再安排下一次（见 _schedule_poll）
+            if not hasattr(self, "pollTimer"):
+                self.pollTimer = QtCore.QTimer(self)
+                self.pollTimer.setSingleShot(True)
+                self.pollTimer.timeout.connect(self._poll_current)
+            self.pollTimer.stop()
+            self._poll_interval = 1500
+            self._last_poll_state = None
             self._poll_current()
-            self.pollTimer = QtCore.QTimer(self)
-            self.pollTimer.timeout.connect(self._poll_current)
-            self.pollTimer.start(3000)
-            QtCore.QTimer.singleShot(2500, self._poll_current)
         reply.deleteLater()
 
     def _poll_current(self):
@@ -904,6 +1003,15 @@ class MainWindow(QtWidgets.QMainWindow):
         if jid:
             self.api_client.get_job(jid)
 
+    def _schedule_poll(self, state=None):
+        """安排下一次轮询：任务状态有变化时回到 1.5s，无变化时逐步退避到 8s"""
+        if state is not None and state != self._last_poll_state:
+            self._poll_interval = 1500
+        else:
+            self._poll_interval = min(self._poll_interval * 2, 8000)
+        self._last_poll_state = state
+        self.pollTimer.start(self._poll_interval)
+
     def _download_results(self, job_id: str, urls: Dict[str, str]):
         """下载翻译结果"""
         if not hasattr(self, "_dl_handles"):
@@ -918,43 +1026,52 @@ class MainWindow(QtWidgets.QMainWindow):
             return f"{self._safe_filename(stem)}_{suffix}" if suffix else self._safe_filename(stem)
 
         # 下载目录
-        from config.settings import RESULT_DIR, SUB_RESULT_DIR, VIDEO_RESULT_DIR
-
         os.makedirs(SUB_RESULT_DIR, exist_ok=True)
         os.makedirs(VIDEO_RESULT_DIR, exist_ok=True)
 
         # 检查是否需要烧录字幕
         should_burn = (getattr(self, "_pipeline_params", {}) or {}).get("burn_subtitles", True)
 
-        from PyQt5.QtCore import QFile, QUrl
-        from PyQt5.QtNetwork import QNetworkRequest
+        # 分块写盘：每次最多取 1MB，避免一次性 readAll 产生大块内存
+        def drain(r, file):
+            while r.bytesAvailable() > 0:
+                file.write(r.read(1 << 20))
+
+        # 决定烧录/完成的字幕文件：有 ass 用 ass，否则退回 srt
+        trigger_key = "ass" if urls.get("ass") else "srt"
+        # 所有结果文件共用同一个文件名主干，只算一次
+        stem = with_suffix(base_stem)
 
+        # 三个文件同时发起下载；字幕文件较小且决定后续流程，优先调度
         for key in ("srt", "ass", "video"):
             url = urls.get(key)
             if not url:
                 continue
 
-            base = QUrl(self.api_client.base_url + "/")
-            full = base.resolved(QUrl(url))
+            full = self.api_client.base_qurl.resolved(QUrl(url))
             req = QNetworkRequest(full)
-            if self.api_client.token:
-                req.setRawHeader(b"Authorization", f"Bearer {self.api_client.token}".encode())
+            req.setPriority(QNetworkRequest.HighPriority if key in ("srt", "ass") else QNetworkRequest.LowPriority)
+            req.setAttribute(QNetworkRequest.Http2AllowedAttribute, True)
+            if self.api_client.auth_header:
+                req.setRawHeader(b"Authorization", self.api_client.auth_header)
             reply = self.api_client.nam.get(req)
+            # 限制 Qt 内部缓冲，写盘跟不上时由网络层自动减速
+            reply.setReadBufferSize(4 * 1024 * 1024)
 
             if key in ("srt", "ass"):
-                filename = f"{with_suffix(base_stem)}.{key}"
+                filename = f"{stem}.{key}"
                 out_dir = SUB_RESULT_DIR
             else:
                 # 处理视频文件名
-                from urllib.parse import unquote
                 url_name = unquote(full.path().split('/')[-1])
                 ext = os.path.splitext(url_name)[1].lower() or ".mp4"
-                filename = f"{with_suffix(base_stem)}{ext}"
+                filename = f"{stem}{ext}"
                 out_dir = VIDEO_RESULT_DIR
 
-            out_path = os.path.join(out_dir, filename)
+            out_path = f"{out_dir}{os.sep}{filename}"
             f = QFile(out_path)
-            if not f.open(QFile.WriteOnly):
+            # Qt 已经缓冲了网络数据，文件侧不再重复缓冲
+            if not f.open(QFile.WriteOnly | QFile.Unbuffered):
                 reply.abort()
                 reply.deleteLater()
                 continue
@@ -962,35 +1079,29 @@ class MainWindow(QtWidgets.QMainWindow):
             self._dl_handles.append((reply, f))
 
             def on_ready_read(r=reply, file=f):
-                file.write(r.readAll())
+                drain(r, file)
 
-            def on_finished(r=reply, file=f, p=out_path, k=key, all_urls=urls):
+            def on_finished(r=reply, file=f, p=out_path, k=key):
+                drain(r, file)
                 file.close()
                 notify(self, f"已下载 {os.path.basename(p)}")
 
                 if k in ("srt", "ass"):
                     # 启用字幕按钮
                     self.upload_page.enableResultButtons(video_ok=False, subs_ok=True)
-                    video_src_local = (getattr(self, "_pipeline_params", {}) or {}).get("video_path")
-
-                    # LOGIC: Decide whether to call Embed (Burn) or Finish immediately
-                    if k == "ass":
-                        if should_burn:
-                            # 如果用户选择了烧录字幕，则需要实现嵌入字幕的逻辑
-                            self._embed_subtitles(video_src_local, p)
-                        else:
-                            # User skipped burning: We are done.
-                            self.upload_page.setProgress(100)
-                            self.upload_page.setStep("任务完成 (仅生成字幕)")
-                    elif k == "srt" and not all_urls.get("ass"):
-                        # Fallback if only SRT exists
-                        if should_burn:
-                            # 如果用户选择了烧录字幕，则需要实现嵌入字幕的逻辑
-                            self._embed_subtitles(video_src_local, p)
-                        else:
-                            # User skipped burning: We are done.
-                            self.upload_page.setProgress(100)
-                            self.upload_page.setStep("任务完成 (仅生成字幕)")
+
+                # LOGIC: Decide whether to call Embed (Burn) or Finish immediately
+                # 字幕一到就开始处理，不必等待视频下载完成
+                if k == trigger_key:
+                    if should_burn:
+                        # 如果用户选择了烧录字幕，则需要实现嵌入字幕的逻辑
+                        video_src_local = (getattr(self, "_pipeline_params", {}) or {}).get("video_path")
+                        self._embed_subtitles(video_src_local, p)
+                    else:
+                        # User skipped burning: We are done.
+                        self.upload_page.setProgress(100)
+                        self.upload_page.setStep("任务完成 (仅生成字幕)")
+                        self.upload_page.flush_log()
 
                 try:
                     r.deleteLater()
@@ -998,30 +1109,51 @@ class MainWindow(QtWidgets.QMainWindow):
                 except Exception:
                     pass
 
+                # 最后一个文件下载完成时，烧录可能仍在进行，最终状态由 _on_burn_done 设置
+                if not self._dl_handles and self._burnProc is not None \
+                        and self._burnProc.state() != QProcess.NotRunning:
+                    self.upload_page.setStep("结果下载完成，正在渲染字幕...")
+
             reply.readyRead.connect(on_ready_read)
             reply.finished.connect(on_finished)
 
-        # 任务完成
-        self.upload_page.setProgress(100)
-        self.upload_page.setStep("任务全部完成！")
-
-    def _safe_filename(self, filename: str) -> str:
-        """安全的文件名"""
-        import re
-        return re.sub(r'[<>:"/\\|?*\x00-\x1F]', '_', filename)
-
     def _open_video_location(self):
         """打开视频结果目录"""
-        import platform
-        from config.settings import VIDEO_RESULT_DIR
         os.makedirs(VIDEO_RESULT_DIR, exist_ok=True)
+        # 由 Qt 按平台异步打开，不阻塞界面线程
+        QDesktopServices.openUrl(QUrl.fromLocalFile(os.path.abspath(VIDEO_RESULT_DIR)))
+
+    def _queue_progress(self, pct: int):
+        """记录待刷新的进度，合并高频更新"""
+        self._pending_progress = pct
+        if not self._progressTimer.isActive():
+            self._progressTimer.start()
+
+    def _flush_progress(self):
+        """把最新的进度刷新到进度条，没有新进度时停止定时器"""
+        if self._pending_progress is None:
+            self._progressTimer.stop()
+            return
+        pct, self._pending_progress = self._pending_progress, None
+        if hasattr(self, "upload_page"):
+            self.upload_page.setProgress(pct)
+
+    def _burn_ffmpeg_path(self) -> str:
+        """烧录字幕使用的 ffmpeg 路径"""
+        ffmpeg_path = getattr(self, 'ffmpeg_path', None)
+        if not ffmpeg_path or not os.path.exists(ffmpeg_path):
+            ffmpeg_path = os.path.join(os.path.dirname(__file__), "resources", "bin", "ffmpeg.exe")
+            if not os.path.exists(ffmpeg_path): ffmpeg_path = "ffmpeg"
+        return ffmpeg_path
 
-        if platform.system() == "Windows":
-            os.startfile(VIDEO_RESULT_DIR)
-        elif platform.system() == "Darwin":  # macOS
-            os.system(f"open '{VIDEO_RESULT_DIR}'")
-        else:  # Linux
-            os.system(f"xdg-open '{VIDEO_RESULT_DIR}'")
+    def _prewarm_ffmpeg(self):
+        """预先运行一次 ffmpeg，让系统缓存其 DLL，缩短首次烧录的启动时间"""
+        proc = QProcess(self)
+        proc.finished.connect(proc.deleteLater)
+        proc.errorOccurred.connect(lambda _err: proc.deleteLater())
+        proc.start(self._burn_ffmpeg_path(), ["-hide_banner", "-version"])
+        # 编码器探测要跑 ffmpeg -encoders 和几次测试编码，放到后台线程提前完成
+        warm_h264_encoder(self._burn_ffmpeg_path(), self)
 
     def _embed_subtitles(self, video_in: str, subs_path: str):
         """
@@ -1029,47 +1161,54 @@ class MainWindow(QtWidgets.QMainWindow):
         修正逻辑：所有尺寸（字号、黑条高、抬高、边距）均基于视频【短边】计算。
         彻底解决竖屏下黑条过大、留白过多的问题。
         """
-        import subprocess
-        import re
-        import uuid
-        import time
-        from PyQt5.QtCore import QProcess
-
         # --- 0. 基础检查 ---
         if not video_in or not os.path.exists(video_in):
-            if hasattr(self, "upload_page"): self.upload_page.setStep("错误：视频文件不存在")
+            if hasattr(self, "upload_page"):
+                self.upload_page.setStep("错误：视频文件不存在")
+                self.upload_page.flush_log()
             return
         if not subs_path or not os.path.exists(subs_path):
-            if hasattr(self, "upload_page"): self.upload_page.setStep("错误：字幕文件不存在")
+            if hasattr(self, "upload_page"):
+                self.upload_page.setStep("错误：字幕文件不存在")
+                self.upload_page.flush_log()
             return
 
-        ffmpeg_path = getattr(self, 'ffmpeg_path', None)
-        if not ffmpeg_path or not os.path.exists(ffmpeg_path):
-            ffmpeg_path = os.path.join(os.path.dirname(__file__), "resources", "bin", "ffmpeg.exe")
-            if not os.path.exists(ffmpeg_path): ffmpeg_path = "ffmpeg"
-
-        # --- 1. 获取视频信息 ---
-        def _get_video_info(path):
-            try:
-                ffprobe_path = ffmpeg_path.replace("ffmpeg.exe", "ffprobe.exe")
-                if not os.path.exists(ffprobe_path) and "ffmpeg" not in ffprobe_path:
-                    ffprobe_path = "ffprobe"
-
-                cmd_size = [ffprobe_path, "-v", "error", "-select_streams", "v:0",
-                            "-show_entries", "stream=width,height", "-of", "csv=s=x:p=0", path]
-                si = subprocess.STARTUPINFO()
-                si.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-                out_size = subprocess.check_output(cmd_size, startupinfo=si, text=True).strip()
-                w, h = map(int, out_size.split("x"))
-
-                cmd_dur = [ffprobe_path, "-v", "error", "-show_entries", "format=duration", "-of",
-                           "default=noprint_wrappers=1:nokey=1", path]
-                out_dur = subprocess.check_output(cmd_dur, startupinfo=si, text=True).strip()
-                return w, h, float(out_dur)
-            except:
-                return 1920, 1080, 1.0
+        if self._burnProc is not None and self._burnProc.state() != QProcess.NotRunning:
+            if hasattr(self, "upload_page"): self.upload_page.setStep("已有字幕渲染任务在进行")
+            return
 
-        video_w, video_h, video_duration = _get_video_info(video_in)
+        ffmpeg_path = self._burn_ffmpeg_path()
+
+        # --- 1. 获取视频信息（与预览共用 probe_video_info 的缓存）---
+        ffprobe_path = ffmpeg_path.replace("ffmpeg.exe", "ffprobe.exe")
+        if not os.path.exists(ffprobe_path) and "ffmpeg" not in ffprobe_path:
+            ffprobe_path = "ffprobe"
+        video_w, video_h, video_duration = probe_video_info(video_in, ffprobe_path)
+
+        # 软字幕：视频、音频流直接复制，只封装一条字幕轨，无需重新编码
+        burn_mode = (getattr(self, "_pipeline_params", {}) or {}).get("burn_subtitles", True)
+        container = os.path.splitext(video_in)[1].lower()
+        if burn_mode == "soft":
+            # mp4/mov 以外的容器（flv、webm、avi 等）统一封装成 mkv，mkv 几乎能直接复制任何音视频流
+            if container not in (".mp4", ".mov"):
+                container = ".mkv"
+            if container == ".mkv":
+                sub_codec = "ass" if subs_path.lower().endswith(".ass") else "srt"
+            else:
+                sub_codec = "mov_text"
+            os.makedirs(VIDEO_RESULT_DIR, exist_ok=True)
+            base_name = os.path.splitext(os.path.basename(video_in))[0]
+            out_path = os.path.join(VIDEO_RESULT_DIR, f"{base_name}_subtitled{container}")
+            args = [
+                "-y", "-i", os.path.abspath(video_in), "-i", os.path.abspath(subs_path),
+                "-map", "0:v", "-map", "0:a?", "-map", "1:0",
+                "-c", "copy", "-c:s", sub_codec,
+                "-metadata:s:s:0", "language=chi", "-disposition:s:0", "default",
+                out_path
+            ]
+            self._run_burn(ffmpeg_path, args, os.path.dirname(os.path.abspath(subs_path)),
+                           out_path, video_duration, "正在封装软字幕...")
+            return
 
         # 【核心修正 1】定义短边基准
         # 无论是 1920x1080 还是 1080x1920，min_dim 都是 1080
@@ -1104,12 +1243,18 @@ class MainWindow(QtWidgets.QMainWindow):
         temp_ass_path = os.path.join(os.path.dirname(video_in), f"temp_style_{uuid.uuid4().hex[:6]}.ass")
 
         def _build_ass(src_srt, output_ass, w, h):
-            try:
-                import pysubs2
-            except ImportError:
+            if not HAS_PYSUBS2:
                 return src_srt, 2
 
-            subs = pysubs2.load(src_srt)
+            cache_key = (src_srt, os.stat(src_srt).st_mtime_ns)
+            cached = _SUBS_CACHE.get(cache_key)
+            if cached is None:
+                if len(_SUBS_CACHE) >= 8:
+                    _SUBS_CACHE.clear()
+                cached = pysubs2.load(src_srt, encoding="utf-8")
+                _SUBS_CACHE[cache_key] = cached
+            # 下面会逐条改写事件文本，缓存里保留未修改的原件
+            subs = copy.deepcopy(cached)
             subs.info["PlayResX"] = str(w)
             subs.info["PlayResY"] = str(h)
             subs.info["WrapStyle"] = "1"
@@ -1155,12 +1300,14 @@ class MainWindow(QtWidgets.QMainWindow):
                 return r"\N".join(parts)
 
             max_line_count_global = 1
-            CN_RE = re.compile(r"[\u4e00-\u9fff]")
+            # 样式前缀只与字号/颜色有关，循环外拼好一次
+            en_prefix = fr"{{\fn{EN_FONT}\fs{en_fs}\b0\c{EN_COLOR_ASS}}}"
+            zh_prefix = fr"{{\fn{ZH_FONT}\fs{zh_fs}\b1\c{ZH_COLOR_ASS}}}"
 
             for ev in subs:
                 ev.style = "Default"
-                clean_text = re.sub(r"\{.*?\}", "", ev.text)
-                raw_lines = re.split(r"\\[Nn]|\n", clean_text.strip())
+                clean_text = _CURLY_RE.sub("", ev.text)
+                raw_lines = _LINEBREAK_RE.split(clean_text.strip())
 
                 final_text = ""
                 lines_this_event = 0
@@ -1170,25 +1317,23 @@ class MainWindow(QtWidgets.QMainWindow):
                     zh_part = raw_lines[1]
                     zh_processed = _smart_break(zh_part, zh_fs, w)
                     lines_this_event = 1 + zh_processed.count(r"\N") + 1
-                    line1 = fr"{{\fn{EN_FONT}\fs{en_fs}\b0\c{EN_COLOR_ASS}}}{en_part}"
-                    line2 = fr"{{\fn{ZH_FONT}\fs{zh_fs}\b1\c{ZH_COLOR_ASS}}}{zh_processed}"
-                    final_text = line1 + r"\N" + line2
+                    final_text = "".join((en_prefix, en_part, r"\N", zh_prefix, zh_processed))
 
                 elif len(raw_lines) == 1:
                     content = raw_lines[0]
-                    if CN_RE.search(content):
+                    if _CN_RE.search(content):
                         processed = _smart_break(content, zh_fs, w)
                         lines_this_event = processed.count(r"\N") + 1
-                        final_text = fr"{{\fn{ZH_FONT}\fs{zh_fs}\b1\c{ZH_COLOR_ASS}}}{processed}"
+                        final_text = zh_prefix + processed
                     else:
                         lines_this_event = 1
-                        final_text = fr"{{\fn{EN_FONT}\fs{en_fs}\b0\c{EN_COLOR_ASS}}}{content}"
+                        final_text = en_prefix + content
 
                 ev.text = final_text
                 if lines_this_event > max_line_count_global:
                     max_line_count_global = lines_this_event
 
-            subs.save(output_ass)
+            subs.save(output_ass, format_="ass")
             return output_ass, max_line_count_global
 
         try:
@@ -1214,12 +1359,10 @@ class MainWindow(QtWidgets.QMainWindow):
 
         bar_opacity = 0.65
 
-        def _escape_path(p):
-            p = os.path.abspath(p).replace("\\", "/")
-            p = p.replace(":", r"\:")
-            return p
-
-        ass_path_escaped = _escape_path(ass_path)
+        # ffmpeg 滤镜参数里的盘符冒号、UNC 路径转义很脆弱：
+        # 把工作目录切到字幕所在目录，滤镜里只写文件名
+        ass_dir = os.path.dirname(os.path.abspath(ass_path))
+        ass_name = os.path.basename(ass_path)
 
         # 计算 drawbox y坐标
         # 注意：这里的 video_h 不能改，因为这是画布的绝对坐标
@@ -1229,66 +1372,90 @@ class MainWindow(QtWidgets.QMainWindow):
             f"drawbox=x=0:y={box_top_y}:w=iw:h={bar_h}:"
             f"color=black@{bar_opacity}:t=fill"
         )
-        subtitle_filter = f"ass='{ass_path_escaped}'"
+        subtitle_filter = f"ass='{ass_name}'"
         full_filter = f"{drawbox_filter},{subtitle_filter}"
 
-        from config.settings import VIDEO_RESULT_DIR
         os.makedirs(VIDEO_RESULT_DIR, exist_ok=True)
         base_name = os.path.splitext(os.path.basename(video_in))[0]
         out_path = os.path.join(VIDEO_RESULT_DIR, f"{base_name}_subtitled.mp4")
 
+        # 不在界面线程里探测编码器：后台探测尚未完成时本次先用 libx264
+        enc_args = cached_h264_encoder(ffmpeg_path, self)
+        # 使用硬件编码时同时尝试硬件解码（解码帧回到内存，字幕滤镜照常工作）
+        hwaccel = [] if enc_args[1] == "libx264" else ["-hwaccel", "auto"]
         args = [
-            "-y", "-i", video_in,
+            "-y", *hwaccel, "-i", os.path.abspath(video_in),
             "-vf", full_filter,
-            "-c:v", "libx264", "-crf", "18", "-preset", "veryfast",
+            *enc_args,
             "-c:a", "copy",
             out_path
         ]
 
         # --- 4. 执行 ---
-        self._burnProc = QProcess(self)
-        self._burnProc.setProcessChannelMode(QProcess.MergedChannels)
-        self._burn_total = video_duration
+        cleanup = temp_ass_path if temp_ass_path != subs_path else None
+        self._run_burn(ffmpeg_path, args, ass_dir, out_path, video_duration, "正在渲染字幕...", cleanup)
+
+    def _run_burn(self, ffmpeg_path: str, args: list, work_dir: str, out_path: str,
+                  duration: float, step_text: str, cleanup_path: Optional[str] = None):
+        """启动 ffmpeg 合成视频，并跟踪进度"""
+        if self._burnProc is None:
+            self._burnProc = QProcess(self)
+            self._burnProc.setProcessChannelMode(QProcess.MergedChannels)
+        else:
+            # 复用上一次的进程对象，先断开上一次烧录连接的回调
+            for sig in (self._burnProc.readyReadStandardOutput, self._burnProc.finished):
+                try:
+                    sig.disconnect()
+                except TypeError:
+                    pass
+        self._burnProc.setWorkingDirectory(work_dir)
+        self._burn_total = duration
+        self._burn_buf = bytearray()
 
         def _on_burn_output():
-            if not hasattr(self, "_last_burn_update"): self._last_burn_update = 0
-            now = time.time()
-            if now - self._last_burn_update < 0.5: return
-            self._last_burn_update = now
+            # 只处理新到达的数据：按 ffmpeg 的 \r / \n 分隔，未完整的行留到下次
             try:
-                chunk = bytes(self._burnProc.readAllStandardOutput()).decode(errors="ignore")
-                m = re.search(r"time=(\d+):(\d+):(\d+\.?\d*)", chunk)
+                buf = self._burn_buf
+                buf += bytes(self._burnProc.readAllStandardOutput())
+                idx = max(buf.rfind(b"\r"), buf.rfind(b"\n"))
+                if idx < 0:
+                    return
+                complete = bytes(buf[:idx])
+                del buf[:idx + 1]
+                pos = complete.rfind(b"time=")
+                m = _TIME_RE.match(complete, pos) if pos >= 0 else None
                 if m:
                     cur_sec = int(m.group(1)) * 3600 + int(m.group(2)) * 60 + float(m.group(3))
                     pct = min(int(cur_sec / (self._burn_total or 1) * 100), 99)
-                    if hasattr(self, "upload_page"): self.upload_page.setProgress(pct)
+                    self._queue_progress(pct)
             except:
                 pass
 
         def _on_burn_done(code, _status):
-            if os.path.exists(temp_ass_path) and temp_ass_path != subs_path:
+            self._pending_progress = None
+            if cleanup_path and os.path.exists(cleanup_path):
                 try:
-                    os.remove(temp_ass_path)
+                    os.remove(cleanup_path)
                 except:
                     pass
             if code == 0 and os.path.exists(out_path):
-                from ui.components import notify
-                notify(self, f"完成：{os.path.basename(out_path)}")
                 if hasattr(self, "upload_page"):
                     self.upload_page.enableResultButtons(video_ok=True, subs_ok=True)
                     self.upload_page.setProgress(100)
                     self.upload_page.setStep("任务全部完成！")
+                    # 先写出缓冲的日志，再弹出完成提示
+                    self.upload_page.flush_log()
+                notify(self, f"完成：{os.path.basename(out_path)}")
             else:
-                if hasattr(self, "upload_page"): self.upload_page.setStep("合成视频失败")
-            if self._burnProc:
-                self._burnProc.deleteLater()
-                self._burnProc = None
+                if hasattr(self, "upload_page"):
+                    self.upload_page.setStep("合成视频失败")
+                    self.upload_page.flush_log()
 
         self._burnProc.readyReadStandardOutput.connect(_on_burn_output)
         self._burnProc.finished.connect(_on_burn_done)
 
         if hasattr(self, "upload_page"):
-            self.upload_page.setStep("正在渲染字幕...")
+            self.upload_page.setStep(step_text)
             self.upload_page.setProgress(0)
 
         self._burnProc.start(ffmpeg_path, args)
@@ -1567,16 +1734,9 @@ class MainWindow(QtWidgets.QMainWindow):
 
     def _open_subs_location(self):
         """打开字幕结果目录"""
-        import platform
-        from config.settings import SUB_RESULT_DIR
         os.makedirs(SUB_RESULT_DIR, exist_ok=True)
-
-        if platform.system() == "Windows":
-            os.startfile(SUB_RESULT_DIR)
-        elif platform.system() == "Darwin":  # macOS
-            os.system(f"open '{SUB_RESULT_DIR}'")
-        else:  # Linux
-            os.system(f"xdg-open '{SUB_RESULT_DIR}'")
+        # 由 Qt 按平台异步打开，不阻塞界面线程
+        QDesktopServices.openUrl(QUrl.fromLocalFile(os.path.abspath(SUB_RESULT_DIR)))
 
     def closeEvent(self, event):
         save_config(self.config)
@@ -1,5 +1,33 @@
+import re
+
 from PyQt5 import QtCore, QtGui, QtWidgets
 
+# 中国手机号格式（11位数字，以1开头，第二位为3-9）
+_PHONE_RE = re.compile(r'^1[3-9]\d{9}$')
+# 邮箱格式，要求域名后缀为 2-10 个字母
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,10}$')
+
+# 本模块控件的样式挂在应用级样式表上，按 objectName 匹配，只解析一次
+_TOAST_QSS = """
+#toast, #toast QLabel {
+    background-color: rgba(50, 50, 50, 180);
+    color: white;
+    border-radius: 8px;
+    padding: 15px;
+    font-size: 14px;
+}
+"""
+_COMPONENTS_QSS = _TOAST_QSS + """
+QLabel#statusLab { color: #888; }
+"""
+
+
+def _ensure_components_qss():
+    """确保应用样式表中包含本模块的样式（切换主题会整体替换样式表）"""
+    app = QtWidgets.QApplication.instance()
+    if app is not None and _COMPONENTS_QSS not in app.styleSheet():
+        app.setStyleSheet(app.styleSheet() + _COMPONENTS_QSS)
+
 
 class Toast(QtWidgets.QWidget):
     """A semi-transparent popup notification widget."""
@@ -8,24 +36,26 @@ class Toast(QtWidgets.QWidget):
         super().__init__(parent)
         self.setAttribute(QtCore.Qt.WA_TranslucentBackground)
         self.setWindowFlags(QtCore.Qt.FramelessWindowHint | QtCore.Qt.WindowStaysOnTopHint | QtCore.Qt.Tool)
-        self.setStyleSheet("""
-            background-color: rgba(50, 50, 50, 180);
-            color: white;
-            border-radius: 8px;
-            padding: 15px;
-            font-size: 14px;
-        """)
+        self.setObjectName("toast")
         layout = QtWidgets.QVBoxLayout(self)
         self.label = QtWidgets.QLabel()
         self.label.setAlignment(QtCore.Qt.AlignCenter)
         layout.addWidget(self.label)
         self.timer = QtCore.QTimer(self)
-        self.timer.timeout.connect(self.close)
+        self.timer.setSingleShot(True)
+        # 只隐藏不销毁，以便同一个 Toast 重复使用
+        self.timer.timeout.connect(self.hide)
         self.resize(300, 60)
+        # 上一条消息的文字宽度，宽度不变时沿用当前尺寸
+        self._last_text_width = -1
 
     def show_message(self, message: str, duration: int = 2000):
+        _ensure_components_qss()
         self.label.setText(message)
-        self.adjustSize()
+        text_width = self.label.fontMetrics().boundingRect(message).width()
+        if text_width != self._last_text_width:
+            self.adjustSize()
+            self._last_text_width = text_width
         if self.parent():
             center = self.parent().geometry().center()
             self.move(center.x() - self.width() // 2, center.y() - self.height() // 2)
@@ -35,7 +65,12 @@ class Toast(QtWidgets.QWidget):
 
 def notify(parent, message: str, duration: int = 2000):
     """Show a toast notification."""
-    toast = Toast(parent)
+    # 每个父窗口共用一个 Toast，避免每条通知都重新创建控件
+    toast = getattr(parent, "_shared_toast", None) if parent is not None else None
+    if toast is None:
+        toast = Toast(parent)
+        if parent is not None:
+            parent._shared_toast = toast
     toast.show_message(message, duration)
 
 
@@ -76,18 +111,20 @@ class LoginDialog(QtWidgets.QDialog):
         self.emailEdit.setAttribute(QtCore.Qt.WA_InputMethodEnabled, True)
         self.emailEdit.setInputMethodHints(QtCore.Qt.ImhEmailCharactersOnly)
 
-        # 初始化堆叠布局索引
-        self.stack = None
-
         self.otpEdit = QtWidgets.QLineEdit()
         self.otpEdit.setPlaceholderText("验证码")
         self.otpEdit.setMaxLength(6)
+        # 只允许输入数字，格式在输入时就保证，点击登录时无需再校验
+        self.otpEdit.setValidator(QtGui.QRegExpValidator(QtCore.QRegExp(r"\d{0,6}"), self))
+        # 验证码是否已发送成功（发送成功且输满6位后才允许登录）
+        self._otp_sent = False
         self.sendBtn = QtWidgets.QPushButton("发送验证码")
         self.sendBtn.setEnabled(False)  # 默认禁用
         self.verifyBtn = QtWidgets.QPushButton("登录")
         self.verifyBtn.setEnabled(False)
         self.statusLab = QtWidgets.QLabel("")
-        self.statusLab.setStyleSheet("color:#888")
+        self.statusLab.setObjectName("statusLab")
+        _ensure_components_qss()
 
         # 布局设置
         modeLay = QtWidgets.QHBoxLayout()
@@ -114,11 +151,12 @@ class LoginDialog(QtWidgets.QDialog):
         self.sendBtn.clicked.connect(self._send)
         self.verifyBtn.clicked.connect(self._verify)
         self.api.requestFinished.connect(self._on_api)
-        self.modePhone.toggled.connect(lambda checked: self._toggle_mode(checked, True))
-        self.modeEmail.toggled.connect(lambda checked: self._toggle_mode(checked, False))
+        # 两个单选按钮互斥，只需监听手机号按钮：checked 即表示是否为手机号模式
+        self.modePhone.toggled.connect(self._toggle_mode)
         # 连接初始输入框事件
         self.phoneEdit.textChanged.connect(self._on_input_changed)
         self.emailEdit.textChanged.connect(self._on_input_changed)
+        self.otpEdit.textChanged.connect(self._update_verify_btn)
 
         # 冷却计时器
         self._cooldown = 0
@@ -126,8 +164,17 @@ class LoginDialog(QtWidgets.QDialog):
         self._timer.setInterval(1000)
         self._timer.timeout.connect(self._tick)
 
+        # 输入防抖：连续输入/输入法组字只在停顿 50ms 后更新一次按钮状态
+        self._input_debounce = QtCore.QTimer(self)
+        self._input_debounce.setSingleShot(True)
+        self._input_debounce.setInterval(50)
+        self._input_debounce.timeout.connect(self._apply_input_state)
+
         # 确保初始状态正确（在所有组件初始化完成后再设置默认选中状态）
+        # 手机号按钮本就未选中，选中邮箱不会触发 toggled，需手动应用一次
+        self._current_mode_is_phone = None
         self.modeEmail.setChecked(True)
+        self._toggle_mode(False)
 
     def _wrap(self, widget_or_layout):
         w = QtWidgets.QWidget()
@@ -139,67 +186,70 @@ class LoginDialog(QtWidgets.QDialog):
         return w
 
     def _wrap_two(self, w1, w2):
+        # 两个输入框互斥显示，直接切换可见性即可
         w = QtWidgets.QWidget()
-        lay = QtWidgets.QStackedLayout(w)
+        lay = QtWidgets.QHBoxLayout(w)
         lay.addWidget(w1)
         lay.addWidget(w2)
-        self.stack = lay
+        w2.setVisible(False)
         return w
 
-    def _toggle_mode(self, checked: bool, is_phone: bool = None):
-        # 只有在checked为True时才执行切换逻辑（避免重复执行）
-        if not checked:
+    def _toggle_mode(self, is_phone: bool):
+        # 模式没有变化时不做任何处理
+        if is_phone == self._current_mode_is_phone:
             return
+        self._current_mode_is_phone = is_phone
 
-        # 如果没有传入is_phone参数，则根据sender确定当前切换的模式
-        if is_phone is None:
-            sender = self.sender()
-            is_phone = (sender == self.modePhone) if sender else self.modePhone.isChecked()
-
-        # 确保stack已初始化后再设置索引
-        if self.stack is not None:
-            self.stack.setCurrentIndex(0 if is_phone else 1)
-        else:
-            # 如果stack还未初始化，直接设置输入框可见性
+        # 批量修改控件属性，结束后统一重绘一次
+        self.setUpdatesEnabled(False)
+        try:
             self.phoneEdit.setVisible(is_phone)
             self.emailEdit.setVisible(not is_phone)
 
-        self.verifyBtn.setEnabled(False)
-        self.statusLab.setText("")
-
-        # 确保当前可见的输入框能正常接收焦点并更新占位符文本
-        if is_phone:
+            self._otp_sent = False
+            self.verifyBtn.setEnabled(False)
+            self.statusLab.setText("")
+
+            # 确保当前可见的输入框启用并可编辑，并更新占位符文本
+            edit = self.phoneEdit if is_phone else self.emailEdit
+            placeholder = "请输入手机号" if is_phone else "请输入邮箱地址"
+            if not edit.isEnabled():
+                edit.setEnabled(True)
+            if edit.isReadOnly():
+                edit.setReadOnly(False)
+            if edit.placeholderText() != placeholder:
+                edit.setPlaceholderText(placeholder)
             # 使用singleShot延迟设置焦点，确保界面更新完成
-            QtCore.QTimer.singleShot(0, lambda: self.phoneEdit.setFocus())
-            # 确保手机号输入框启用并可编辑
-            self.phoneEdit.setEnabled(True)
-            self.phoneEdit.setReadOnly(False)
-            # 更新占位符文本
-            self.phoneEdit.setPlaceholderText("请输入手机号")
-        else:
-            # 使用singleShot延迟设置焦点，确保界面更新完成
-            QtCore.QTimer.singleShot(0, lambda: self.emailEdit.setFocus())
-            # 确保邮箱输入框启用并可编辑
-            self.emailEdit.setEnabled(True)
-            self.emailEdit.setReadOnly(False)
-            # 更新占位符文本
-            self.emailEdit.setPlaceholderText("请输入邮箱地址")
-            # 强制刷新邮箱输入框的状态
-            self.emailEdit.repaint()
+            QtCore.QTimer.singleShot(0, edit.setFocus)
+        finally:
+            self.setUpdatesEnabled(True)
+        self.update()
 
     def _on_input_changed(self, text):
+        self._input_debounce.start()
+
+    def _apply_input_state(self):
         # 当输入框有内容时启用发送验证码按钮
-        has_content = bool(text.strip())
-        self.sendBtn.setEnabled(has_content)
+        edit = self.phoneEdit if self.modePhone.isChecked() else self.emailEdit
+        has_content = bool(edit.text().strip())
+        if self.sendBtn.isEnabled() != has_content:
+            self.sendBtn.setEnabled(has_content)
+
+    def _update_verify_btn(self, *_):
+        self.verifyBtn.setEnabled(self._otp_sent and len(self.otpEdit.text()) == 6)
 
     def _tick(self):
         self._cooldown -= 1
         if self._cooldown <= 0:
             self._timer.stop()
-            self.sendBtn.setEnabled(True)
-            self.sendBtn.setText("发送验证码")
+            if not self.sendBtn.isEnabled():
+                self.sendBtn.setEnabled(True)
+            new_text = "发送验证码"
         else:
-            self.sendBtn.setText(f"重发({self._cooldown}s)")
+            new_text = f"重发({self._cooldown}s)"
+        # 文本不变时不重复设置，避免多余的重新布局
+        if self.sendBtn.text() != new_text:
+            self.sendBtn.setText(new_text)
 
     def _start_cooldown(self, sec=60):
         self._cooldown = sec
@@ -207,12 +257,10 @@ class LoginDialog(QtWidgets.QDialog):
         self._timer.start()
 
     def _send(self):
-
-        print(f"【DEBUG】modePhone.isChecked(): {self.modePhone.isChecked()}")
-        print(f"【DEBUG】modeEmail.isChecked(): {self.modeEmail.isChecked()}")
         is_phone = self.modePhone.isChecked()
-        phone = self.phoneEdit.text().strip() if is_phone else None
-        email = self.emailEdit.text().strip() if not is_phone else None
+        ident = (self.phoneEdit if is_phone else self.emailEdit).text().strip()
+        phone = ident if is_phone else None
+        email = ident if not is_phone else None
 
         # 验证输入
         if is_phone:
@@ -236,40 +284,20 @@ class LoginDialog(QtWidgets.QDialog):
 
     def _is_valid_phone(self, phone):
         """验证手机号格式是否正确"""
-        import re
-        # 中国手机号格式验证（11位数字，以1开头，第二位为3-9）
-        pattern = r'^1[3-9]\d{9}$'
-        return re.match(pattern, phone) is not None
+        return _PHONE_RE.match(phone) is not None
 
     def _is_valid_email(self, email):
         """验证邮箱格式是否正确"""
-        import re
-        # 更严格的邮箱格式验证
-        # 要求域名后缀至少有2个字符，且只包含字母
-        pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        if not re.match(pattern, email):
-            return False
-
-        # 获取域名后缀
-        domain_suffix = email.split('.')[-1]
-        # 域名后缀只能包含字母
-        if not domain_suffix.isalpha():
-            return False
-
-        # 域名后缀长度应该在2-10个字符之间（常见域名后缀）
-        if len(domain_suffix) < 2 or len(domain_suffix) > 10:
-            return False
-
-        return True
+        # 后缀只含字母、长度 2-10 的要求已由正则保证
+        return _EMAIL_RE.match(email) is not None
 
     def _verify(self):
-        code = self.otpEdit.text().strip()
-        if len(code) != 6 or not code.isdigit():
-            self.statusLab.setText("验证码应为6位数字")
-            return
+        # 校验器只允许数字，登录按钮也只在输满6位时可用
+        code = self.otpEdit.text()
         is_phone = self.modePhone.isChecked()
-        phone = self.phoneEdit.text().strip() if is_phone else None
-        email = self.emailEdit.text().strip() if not is_phone else None
+        ident = (self.phoneEdit if is_phone else self.emailEdit).text().strip()
+        phone = ident if is_phone else None
+        email = ident if not is_phone else None
         self.api.login_verify(otp=code, phone=phone, email=email)
 
     def _on_api(self, ctx: dict, data: dict):
@@ -279,7 +307,8 @@ class LoginDialog(QtWidgets.QDialog):
                 self.statusLab.setText(f"发送失败：{data['error']}")
             else:
                 self.statusLab.setText("验证码已发送")
-                self.verifyBtn.setEnabled(True)
+                self._otp_sent = True
+                self._update_verify_btn()
                 self._start_cooldown(60)
         elif op == "login_verify":
             if "error" in data:
@@ -290,19 +319,11 @@ class LoginDialog(QtWidgets.QDialog):
             if token:
                 self.api.set_token(token)
                 self.statusLab.setText("登录成功！")
-                info = {}
-                if self.modePhone.isChecked():
-                    info["phone"] = self.phoneEdit.text().strip()
-                else:
-                    info["email"] = self.emailEdit.text().strip()
+                is_phone = self.modePhone.isChecked()
+                key = "phone" if is_phone else "email"
+                info = {key: (self.phoneEdit if is_phone else self.emailEdit).text().strip()}
+                # 由接收方（主窗口）负责保存到配置
                 self.authed.emit(info)
-                # 为了兼容旧代码，我们需要在这里保存用户信息到配置中
-                if hasattr(self.parent(), 'config'):
-                    config = self.parent().config
-                    if self.modePhone.isChecked():
-                        config["phone"] = self.phoneEdit.text().strip()
-                    else:
-                        config["email"] = self.emailEdit.text().strip()
                 self.accept()
 
     def get_credentials(self):
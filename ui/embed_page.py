@@ -1,10 +1,55 @@
 from PyQt5 import QtWidgets, QtCore, QtGui
-from core.subtitle_processor import create_preview_frame, SubtitleEmbedder
+from core.subtitle_processor import (
+    PreviewWorker, SubtitleEmbedder, SubtitleLoadWorker, cached_h264_encoder, prefetch_file,
+    warm_h264_encoder
+)
 from config.settings import RESULT_DIR, SUB_RESULT_DIR, VIDEO_RESULT_DIR
 import os
+import sys
 import shutil
+import subprocess
+import tempfile
 import uuid
 import re
+import functools
+import contextlib
+from collections import OrderedDict
+
+# 预览缓存的最大条数
+_PREVIEW_CACHE_SIZE = 8
+
+# 安全路径以外的字符：出现时才需要把字幕复制成临时文件
+_UNSAFE_CHARS = re.compile(r"[^A-Za-z0-9_./\\:\- ]")
+
+
+@functools.lru_cache(maxsize=256)
+def _ass_color(rgb):
+    """0xRRGGBB -> ASS 颜色 &H00BBGGRR"""
+    r, g, b = (rgb >> 16) & 0xFF, (rgb >> 8) & 0xFF, rgb & 0xFF
+    return f"&H00{b:02X}{g:02X}{r:02X}"
+
+
+@functools.lru_cache(maxsize=256)
+def _color_btn_style(rgb):
+    """颜色按钮的样式表：背景为所选颜色，文字按亮度选黑或白"""
+    r, g, b = (rgb >> 16) & 0xFF, (rgb >> 8) & 0xFF, rgb & 0xFF
+    # BT.601 亮度，整数运算（系数放大 1000 倍）
+    text_color = "black" if 299 * r + 587 * g + 114 * b > 128000 else "white"
+    return f"""
+            QPushButton {{
+                background-color: #{rgb:06x};
+                border: 1px solid #888;
+                border-radius: 4px;
+                color: {text_color};
+            }}
+        """
+
+
+# 文件对话框的标题和过滤器
+SUB_DIALOG_TITLE = "选择字幕文件"
+SUB_FILTER = "Subtitle Files (*.srt *.ass *.ssa *.vtt)"
+VIDEO_DIALOG_TITLE = "选择视频文件"
+VIDEO_FILTER = "Video Files (*.mp4 *.avi *.mkv *.mov *.flv)"
 
 
 class EmbedSubtitlesPage(QtWidgets.QWidget):
@@ -12,18 +57,67 @@ class EmbedSubtitlesPage(QtWidgets.QWidget):
         super().__init__(parent)
         self.ffmpeg_path = ffmpeg_path
         self.ffprobe_path = ffprobe_path
+        # 硬件编码默认开启：提前在后台探测编码器，点击嵌入时直接读缓存
+        warm_h264_encoder(ffmpeg_path, self)
         self.subtitle_path = ""
         self.video_path = ""
+        # 批量嵌入时选中的全部视频，预览使用第一个
+        self.video_paths = []
+        # 批量嵌入任务状态：进行中的 embedder -> 进度、待处理队列、结果
+        self._embed_jobs = {}
+        self._embed_queue = []
+        self._embed_outputs = []
+        self._embed_errors = []
+        # FFmpeg/FFprobe 路径检查结果，路径变化前一直沿用
+        self._paths_ok = None
 
         # Default colors (RGB for display)
         self.zh_color = QtGui.QColor(255, 195, 0)  # FFC300 (Gold)
         self.other_color = QtGui.QColor(255, 255, 255)  # White
+        # 对应的 ASS 颜色字符串，只在选色时更新
+        self._zh_ass_color = self._get_ass_color(self.zh_color)
+        self._other_ass_color = self._get_ass_color(self.other_color)
+
+        # 预览缓存：参数签名 -> 预览图 JPEG 数据，参数没变时不再调用 FFmpeg
+        self._preview_cache = OrderedDict()
+        # 预览参数签名 -> 各显示尺寸下放入 QPixmapCache 的键，释放预览时一并移除
+        self._pixmap_keys = {}
+        self._last_preview_key = None
+        # 缩放后的预览图放进 QPixmapCache，同一尺寸再次显示时不必重新解码
+        QtGui.QPixmapCache.setCacheLimit(max(QtGui.QPixmapCache.cacheLimit(), 131072))
+        # 正在运行的预览线程及其任务信息 (key, 临时字幕副本路径或 None)
+        self._preview_worker = None
+        self._preview_job = None
+        # 预览生成期间又有参数变化，结束后需要再生成一次
+        self._preview_pending = False
+        # 已解析的字幕及其对应的 (路径, 修改时间, 大小)，文件变化后失效
+        self._parsed_subs = None
+        self._parsed_subs_key = None
+        self._subs_loader = None
+
+        # 文件对话框的初始目录，构造时检查一次，之后沿用上次选择的目录
+        self.refresh_default_dirs()
 
         self._init_ui()
-        self.embedder = SubtitleEmbedder(ffmpeg_path, ffprobe_path)
-        self.embedder.progress.connect(self._on_progress)
-        self.embedder.finished.connect(self._on_finished)
-        self.embedder.error.connect(self._on_error)
+
+        # 参数调整停止 400ms 后自动刷新预览，连续调整只触发一次
+        self._preview_debounce = QtCore.QTimer(self)
+        self._preview_debounce.setSingleShot(True)
+        self._preview_debounce.setInterval(400)
+        self._preview_debounce.timeout.connect(self._generate_preview)
+
+        # 拖动窗口大小时先快速缩放现有图片，停止 150ms 后再按新尺寸清晰显示
+        self._resize_timer = QtCore.QTimer(self)
+        self._resize_timer.setSingleShot(True)
+        self._resize_timer.setInterval(150)
+        self._resize_timer.timeout.connect(self._refresh_preview_size)
+
+        # 嵌入进度先记下，由 10Hz 定时器统一刷新到进度条
+        self._pending_progress = None
+        self._progress_timer = QtCore.QTimer(self)
+        self._progress_timer.setInterval(100)
+        self._progress_timer.timeout.connect(self._flush_progress)
+
 
     def _init_ui(self):
         layout = QtWidgets.QVBoxLayout(self)
@@ -111,6 +205,11 @@ class EmbedSubtitlesPage(QtWidgets.QWidget):
         self.params_layout.addRow("其他语言字体大小:", other_container)
         self.params_layout.addRow("距离视频底部:", self.margin_spinbox)
 
+        # 有可用显卡编码器时用硬件编码，否则自动回退到 libx264
+        self.hw_encode_check = QtWidgets.QCheckBox("使用硬件编码（NVENC / QSV / VideoToolbox）")
+        self.hw_encode_check.setChecked(True)
+        self.params_layout.addRow("", self.hw_encode_check)
+
         # Preview section
         preview_group = QtWidgets.QGroupBox("预览")
         preview_layout = QtWidgets.QVBoxLayout(preview_group)
@@ -155,24 +254,18 @@ class EmbedSubtitlesPage(QtWidgets.QWidget):
 
     def _update_color_btn(self, btn, color):
         """Update button style to show selected color."""
-        # Calculate contrast color for text (black or white)
-        luminance = 0.299 * color.red() + 0.587 * color.green() + 0.114 * color.blue()
-        text_color = "black" if luminance > 128 else "white"
-
-        style = f"""
-            QPushButton {{
-                background-color: {color.name()};
-                border: 1px solid #888;
-                border-radius: 4px;
-                color: {text_color};
-            }}
-        """
+        style = _color_btn_style(color.rgb() & 0xFFFFFF)
+        # 样式没变时不再 setStyleSheet，避免 Qt 重新解析样式表
+        if btn.property("_lastStyle") == style:
+            return
+        btn.setProperty("_lastStyle", style)
         btn.setStyleSheet(style)
 
     def _pick_zh_color(self):
         c = QtWidgets.QColorDialog.getColor(self.zh_color, self, "选择中文字体颜色")
         if c.isValid():
             self.zh_color = c
+            self._zh_ass_color = self._get_ass_color(c)
             self._update_color_btn(self.zh_color_btn, c)
             self._on_param_changed()
 
@@ -180,31 +273,138 @@ class EmbedSubtitlesPage(QtWidgets.QWidget):
         c = QtWidgets.QColorDialog.getColor(self.other_color, self, "选择其他语言字体颜色")
         if c.isValid():
             self.other_color = c
+            self._other_ass_color = self._get_ass_color(c)
             self._update_color_btn(self.other_color_btn, c)
             self._on_param_changed()
 
     def _get_ass_color(self, qcolor):
         """Convert QColor to ASS color format (&HBBGGRR)."""
-        return f"&H00{qcolor.blue():02X}{qcolor.green():02X}{qcolor.red():02X}"
+        return _ass_color(qcolor.rgb() & 0xFFFFFF)
+
+    def update_ffmpeg_paths(self, ffmpeg_path, ffprobe_path):
+        """设置中修改了 FFmpeg 路径后调用"""
+        self.ffmpeg_path = ffmpeg_path
+        self.ffprobe_path = ffprobe_path
+        self._paths_ok = None
+        warm_h264_encoder(ffmpeg_path, self)
+
+    def _validate_ffmpeg(self):
+        """检查 FFmpeg/FFprobe 是否可用，不可用时弹窗提示"""
+        if self._paths_ok is None:
+            self._paths_ok = all(
+                p and (os.path.exists(p) or shutil.which(p))
+                for p in (self.ffmpeg_path, self.ffprobe_path)
+            )
+        if not self._paths_ok:
+            QtWidgets.QMessageBox.warning(self, "FFmpeg未配置", "FFmpeg路径未配置或不存在。")
+        return self._paths_ok
+
+    def refresh_default_dirs(self):
+        """重新计算文件对话框的默认目录"""
+        home = os.path.expanduser("~")
+        self._sub_default_dir = SUB_RESULT_DIR if os.path.isdir(SUB_RESULT_DIR) else home
+        self._video_default_dir = VIDEO_RESULT_DIR if os.path.isdir(VIDEO_RESULT_DIR) else home
 
     def _select_subtitle(self):
         path, _ = QtWidgets.QFileDialog.getOpenFileName(
-            self, "选择字幕文件", SUB_RESULT_DIR, "Subtitle Files (*.srt *.ass *.ssa *.vtt)"
+            self, SUB_DIALOG_TITLE, self._sub_default_dir, SUB_FILTER
         )
         if path:
+            self._sub_default_dir = os.path.dirname(path)
             self.subtitle_path = path
-            self.sub_label.setText(os.path.basename(path))
+            self._set_path_label(self.sub_label, path)
+            self._load_subtitles()
             self._check_ready()
 
     def _select_video(self):
-        path, _ = QtWidgets.QFileDialog.getOpenFileName(
-            self, "选择视频文件", VIDEO_RESULT_DIR, "Video Files (*.mp4 *.avi *.mkv *.mov *.flv)"
+        # 可多选，多个视频时使用同一字幕和参数批量嵌入
+        paths, _ = QtWidgets.QFileDialog.getOpenFileNames(
+            self, VIDEO_DIALOG_TITLE, self._video_default_dir, VIDEO_FILTER
         )
-        if path:
-            self.video_path = path
-            self.video_label.setText(os.path.basename(path))
+        if paths:
+            self._video_default_dir = os.path.dirname(paths[0])
+            self.video_paths = paths
+            self.video_path = paths[0]
+            # 预览和嵌入都要读取视频，提前让系统开始预读
+            for path in paths:
+                prefetch_file(path)
+            if len(paths) > 1:
+                self._set_path_label(self.video_label, "\n".join(paths),
+                                     f"{os.path.basename(paths[0])} 等 {len(paths)} 个文件")
+            else:
+                self._set_path_label(self.video_label, paths[0])
             self._check_ready()
 
+    def _set_path_label(self, label, path, text=None):
+        """文件名过长时中间省略显示，完整路径放在提示里"""
+        label.setProperty("fullText", text or os.path.basename(path))
+        label.setToolTip(path)
+        self._elide_label(label)
+
+    def _elide_label(self, label):
+        text = label.property("fullText")
+        if text:
+            label.setText(label.fontMetrics().elidedText(text, QtCore.Qt.ElideMiddle, max(label.width(), 50)))
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._elide_label(self.sub_label)
+        self._elide_label(self.video_label)
+        # 窗口大小变化时按新尺寸重新缩放当前预览，不重新调用 FFmpeg
+        if not self._last_preview_key or self._last_preview_key not in self._preview_cache:
+            return
+        pixmap = QtGui.QPixmapCache.find(self._pixmap_key(self._last_preview_key))
+        if pixmap is None or pixmap.isNull():
+            current = self.preview_label.pixmap()
+            if current is None or current.isNull():
+                return
+            target, dpr = self._preview_target()
+            pixmap = current.scaled(target, QtCore.Qt.KeepAspectRatio, QtCore.Qt.FastTransformation)
+            pixmap.setDevicePixelRatio(dpr)
+            self._resize_timer.start()
+        self.preview_label.setPixmap(pixmap)
+
+    def _refresh_preview_size(self):
+        data = self._preview_cache.get(self._last_preview_key) if self._last_preview_key else None
+        if data:
+            self._show_preview(data, self._last_preview_key)
+
+    def _subs_key(self):
+        try:
+            st = os.stat(self.subtitle_path)
+        except OSError:
+            return None
+        return (self.subtitle_path, st.st_mtime_ns, st.st_size)
+
+    def _load_subtitles(self):
+        """后台解析当前字幕文件，结果在预览和嵌入时复用"""
+        key = self._subs_key()
+        if key is None or key == self._parsed_subs_key:
+            return
+        self._parsed_subs = None
+        self._parsed_subs_key = None
+        worker = SubtitleLoadWorker(self.subtitle_path, self)
+        worker.finished.connect(lambda subs, w=worker, k=key: self._on_subs_loaded(w, k, subs))
+        self._subs_loader = worker
+        worker.start()
+
+    def _on_subs_loaded(self, worker, key, subs):
+        worker.wait()
+        worker.deleteLater()
+        if worker is self._subs_loader:
+            self._subs_loader = None
+        # 解析期间又换了字幕文件，丢弃旧结果
+        if subs is not None and key == self._subs_key():
+            self._parsed_subs = subs
+            self._parsed_subs_key = key
+
+    def _current_subs(self):
+        """返回当前字幕的解析结果；尚未解析完或文件已修改时返回 None"""
+        if self._parsed_subs is not None and self._parsed_subs_key == self._subs_key():
+            return self._parsed_subs
+        self._load_subtitles()
+        return None
+
     def _check_ready(self):
         """Check if files are selected and enable buttons."""
         ready = bool(self.subtitle_path and self.video_path)
@@ -212,147 +412,243 @@ class EmbedSubtitlesPage(QtWidgets.QWidget):
         self.embed_btn.setEnabled(ready)
 
     def _on_param_changed(self):
-        """Called when parameters change, to hint user to update preview."""
-        if self.preview_label.pixmap():
-            self.status_label.setText("参数已修改，请点击【生成预览】查看效果")
+        """Called when parameters change, to refresh the preview automatically."""
+        if not (self.subtitle_path and self.video_path):
+            return
+        self._preview_debounce.start()
+
+    def _preview_key(self):
+        """当前预览参数的签名（含文件修改时间），用于缓存命中判断"""
+        try:
+            video_mtime = os.stat(self.video_path).st_mtime_ns
+            sub_mtime = os.stat(self.subtitle_path).st_mtime_ns
+        except OSError:
+            return None
+        margin = self.margin_spinbox.value() if self.margin_spinbox.value() > 0 else None
+        return (self.video_path, video_mtime, self.subtitle_path, sub_mtime,
+                self.chinese_fontsize.value(), self.other_fontsize.value(), margin,
+                self._zh_ass_color, self._other_ass_color)
+
+    def _show_preview(self, data, key=None):
+        # 参数还在连续调整（已排队下一次预览）时用快速缩放，稳定后的结果才平滑缩放
+        fast = self._preview_debounce.isActive()
+        target, dpr = self._preview_target()
+        pixmap_key = self._pixmap_key(key)
+        if pixmap_key:
+            pixmap = QtGui.QPixmapCache.find(pixmap_key)
+            if pixmap is not None and not pixmap.isNull():
+                self.preview_label.setPixmap(pixmap)
+                return
+        # 解码时直接缩放到显示尺寸，不必先解出整张原分辨率图片
+        buf = QtCore.QBuffer()
+        buf.setData(data)
+        buf.open(QtCore.QIODevice.ReadOnly)
+        reader = QtGui.QImageReader(buf, b"jpg")
+        size = reader.size()
+        if size.isValid():
+            reader.setScaledSize(size.scaled(target, QtCore.Qt.KeepAspectRatio))
+            # JPEG 解码器在 quality < 50 时使用快速缩放
+            reader.setQuality(0 if fast else 100)
+            image = reader.read()
+            if not image.isNull():
+                pixmap = QtGui.QPixmap.fromImage(image)
+                pixmap.setDevicePixelRatio(dpr)
+                if pixmap_key and not fast:
+                    self._insert_pixmap(key, pixmap_key, pixmap)
+                self.preview_label.setPixmap(pixmap)
+                return
+
+        pixmap = QtGui.QPixmap()
+        pixmap.loadFromData(data)
+        scaled_pixmap = pixmap.scaled(
+            target,
+            QtCore.Qt.KeepAspectRatio,
+            QtCore.Qt.FastTransformation if fast else QtCore.Qt.SmoothTransformation
+        )
+        scaled_pixmap.setDevicePixelRatio(dpr)
+        self.preview_label.setPixmap(scaled_pixmap)
+
+    def _preview_target(self):
+        """预览框的物理像素尺寸和屏幕缩放比：按物理尺寸解码再标记缩放比，HiDPI 屏幕下才清晰"""
+        dpr = self.devicePixelRatioF()
+        size = self.preview_label.size()
+        return QtCore.QSize(max(int(size.width() * dpr), 2), max(int(size.height() * dpr), 2)), dpr
+
+    def _preview_out_size(self):
+        """让 FFmpeg 直接输出预览框物理像素大小的图片"""
+        target, _dpr = self._preview_target()
+        return target.width(), target.height()
+
+    def _trim_preview_cache(self):
+        """嵌入完成后只保留当前这张预览，其余预览数据和缩放图一并释放"""
+        for key in list(self._preview_cache):
+            if key != self._last_preview_key:
+                del self._preview_cache[key]
+                self._drop_pixmaps(key)
+
+    def _insert_pixmap(self, key, pixmap_key, pixmap):
+        QtGui.QPixmapCache.insert(pixmap_key, pixmap)
+        self._pixmap_keys.setdefault(key, set()).add(pixmap_key)
+
+    def _drop_pixmaps(self, key):
+        """移除某张预览在所有显示尺寸下缓存的缩放图"""
+        for pixmap_key in self._pixmap_keys.pop(key, ()):
+            QtGui.QPixmapCache.remove(pixmap_key)
+
+    def _pixmap_key(self, key):
+        """QPixmapCache 的键：预览参数签名 + 当前显示尺寸"""
+        if not key:
+            return None
+        target, _dpr = self._preview_target()
+        return f"preview_{hash(key)}_{target.width()}x{target.height()}"
+
+    def _fits_preview_label(self, image):
+        target, _dpr = self._preview_target()
+        return image.size() == image.size().scaled(target, QtCore.Qt.KeepAspectRatio)
+
+    def _cache_preview(self, key, data):
+        """记录生成好的预览图，超出容量时丢弃最早的一张"""
+        self._preview_cache[key] = data
+        self._preview_cache.move_to_end(key)
+        while len(self._preview_cache) > _PREVIEW_CACHE_SIZE:
+            old_key, _data = self._preview_cache.popitem(last=False)
+            self._drop_pixmaps(old_key)
 
     # 【辅助函数】：安全复制文件，解决 FFmpeg 报错 -22 的问题
     def _create_safe_temp_file(self, original_path):
         """复制文件到临时目录并重命名为安全文件名"""
-        import tempfile
+        # 路径本身已经安全时直接使用原文件
+        if original_path.isascii() and not _UNSAFE_CHARS.search(original_path):
+            return original_path
         ext = os.path.splitext(original_path)[1]
         temp_dir = tempfile.gettempdir()
         safe_name = f"safe_temp_{uuid.uuid4().hex[:8]}{ext}"
         safe_path = os.path.join(temp_dir, safe_name)
         try:
-            shutil.copy2(original_path, safe_path)
+            # 同一分区时硬链接即可，不必复制文件内容
+            try:
+                os.link(original_path, safe_path)
+            except OSError:
+                shutil.copy2(original_path, safe_path)
             return safe_path
         except Exception as e:
             print(f"Error creating temp file: {e}")
             return original_path  # 如果失败，返回原路径
 
-    # 【需求3 修改】：查找字幕第一句的时间，确保预览有画面
-    def _find_subtitle_timestamp(self, file_path):
-        try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-            # 查找 srt/vtt 格式时间: 00:00:05,000
-            m = re.search(r'(\d{1,2}):(\d{2}):(\d{2})[,.](\d{3})', content)
-            if m:
-                h, m, s, ms = map(int, m.groups())
-                # 加 1.5 秒，尽量落在字幕中间
-                return h * 3600 + m * 60 + s + (ms / 1000.0) + 1.5
-        except:
-            pass
-        return 10.0  # 默认
-
     def _generate_preview(self):
         """Generate preview with first subtitle on first frame."""
         if not self.subtitle_path or not self.video_path:
             return
 
-        if not self.ffmpeg_path or not self.ffprobe_path:
-            QtWidgets.QMessageBox.warning(self, "FFmpeg未配置", "FFmpeg路径未配置或不存在。")
+        if not self._validate_ffmpeg():
+            return
+
+        # 参数和文件都没变时直接使用缓存的预览图
+        key = self._preview_key()
+        cached = self._preview_cache.get(key) if key else None
+        if cached:
+            self._preview_cache.move_to_end(key)
+            self._show_preview(cached, key)
+            self._last_preview_key = key
+            self.status_label.setText("预览生成成功")
+            return
+
+        # 上一次预览还在生成中或正在嵌入，结束后再按最新参数生成
+        if self._preview_worker is not None or self._embed_jobs:
+            self._preview_pending = True
             return
 
         self.status_label.setText("正在生成预览...")
         self.preview_btn.setEnabled(False)
-        QtWidgets.QApplication.processEvents()
-
-        safe_sub_path = None
-        preview_path = None
 
         try:
-            import tempfile
-            # Create temp preview image
-            temp_preview = tempfile.NamedTemporaryFile(suffix='.jpg', delete=False)
-            preview_path = temp_preview.name
-            temp_preview.close()
-
             # 【核心修复 1】：使用安全文件名，防止路径含特殊字符导致预览失败
             safe_sub_path = self._create_safe_temp_file(self.subtitle_path)
-
-            # 【核心修复 2】：使用智能时间戳，防止截取到无字幕画面
-            # 注意：这里我们无法直接传时间参数给 create_preview_frame（因为它定义死只截开头）
-            # 所以我们只能在这里重写简单的截图逻辑，绕过 create_preview_frame 的限制
-
-            # Get parameters
-            chinese_factor = self.chinese_fontsize.value()
-            other_factor = self.other_fontsize.value()
-            margin = self.margin_spinbox.value() if self.margin_spinbox.value() > 0 else None
-            zh_ass_color = self._get_ass_color(self.zh_color)
-            other_ass_color = self._get_ass_color(self.other_color)
-
-            # 我们调用 embedder 内的方法来生成样式文件，但自己截图
-            # 为了简单起见，这里我们直接调用 create_preview_frame，但
-            # *关键技巧*：我们传入的 video_path 加上 seek 参数？不，ffprobe 不支持。
-
-            # 既然你是为了恢复字幕显示，最稳妥的方法是：
-            # 依然使用 create_preview_frame，但我们要确保它能处理文件名中的引号。
-            # 修改: 我们把 safe_sub_path 传给它！
-
-            success = create_preview_frame(
-                self.video_path,
-                safe_sub_path,  # 传入安全路径
-                preview_path,
-                self.ffmpeg_path,
-                self.ffprobe_path,
-                chinese_factor,
-                other_factor,
-                margin,
-                zh_ass_color,
-                other_ass_color
-            )
-
-            if success and os.path.exists(preview_path):
-                pixmap = QtGui.QPixmap(preview_path)
-                scaled_pixmap = pixmap.scaled(
-                    self.preview_label.size(),
-                    QtCore.Qt.KeepAspectRatio,
-                    QtCore.Qt.SmoothTransformation
-                )
-                self.preview_label.setPixmap(scaled_pixmap)
-                self.status_label.setText("预览生成成功")
-            else:
-                self.status_label.setText("预览生成失败")
-
         except Exception as e:
             self.status_label.setText(f"错误: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            self.preview_btn.setEnabled(True)
+            return
 
-        finally:
+        # Get parameters
+        chinese_factor = self.chinese_fontsize.value()
+        other_factor = self.other_fontsize.value()
+        margin = self.margin_spinbox.value() if self.margin_spinbox.value() > 0 else None
+        zh_ass_color = self._zh_ass_color
+        other_ass_color = self._other_ass_color
+
+        # FFmpeg 在后台线程运行，结果通过信号回到界面线程
+        # 只记录临时副本，原文件不能在收尾时被删除（预览期间可能已切换字幕）
+        temp_sub = safe_sub_path if safe_sub_path != self.subtitle_path else None
+        self._preview_job = (key, temp_sub)
+        self._preview_worker = PreviewWorker(
+            self.video_path,
+            safe_sub_path,  # 传入安全路径
+            self.ffmpeg_path,
+            self.ffprobe_path,
+            chinese_factor,
+            other_factor,
+            margin,
+            zh_ass_color,
+            other_ass_color,
+            subs=self._current_subs(),
+            target_size=self._preview_target()[0],
+            out_size=self._preview_out_size()
+        )
+        self._preview_worker.finished.connect(self._on_preview_ready)
+        self._preview_worker.error.connect(self._on_preview_failed)
+        self._preview_worker.start()
+
+    def _finish_preview_job(self):
+        """预览线程结束后的收尾：释放线程、清理临时字幕，返回本次任务信息"""
+        worker, self._preview_worker = self._preview_worker, None
+        if worker is not None:
+            worker.wait()
+            worker.deleteLater()
+        key, safe_sub_path = self._preview_job
+        self._preview_job = None
+        # 嵌入进行中时保持预览按钮禁用，待处理的预览留到嵌入结束后再生成
+        if not self._embed_jobs:
             self.preview_btn.setEnabled(True)
-            # 清理临时文件
-            if safe_sub_path and safe_sub_path != self.subtitle_path and os.path.exists(safe_sub_path):
-                try:
-                    os.remove(safe_sub_path)
-                except:
-                    pass
-            if preview_path and os.path.exists(preview_path):
-                try:
-                    os.remove(preview_path)
-                except:
-                    pass
+            self._resume_pending_preview()
+        if safe_sub_path:
+            with contextlib.suppress(OSError):
+                os.remove(safe_sub_path)
+        return key
+
+    def _resume_pending_preview(self):
+        if self._preview_pending and self._preview_worker is None:
+            self._preview_pending = False
+            self._preview_debounce.start()
+
+    def _on_preview_ready(self, data, image):
+        key = self._finish_preview_job()
+        if image.isNull() or not self._fits_preview_label(image):
+            # 解码失败或期间窗口尺寸变了，按当前尺寸重新解码
+            self._show_preview(data, key)
+        else:
+            pixmap = QtGui.QPixmap.fromImage(image)
+            pixmap.setDevicePixelRatio(self._preview_target()[1])
+            if key:
+                self._insert_pixmap(key, self._pixmap_key(key), pixmap)
+            self.preview_label.setPixmap(pixmap)
+        if key:
+            self._cache_preview(key, data)
+        self._last_preview_key = key
+        self.status_label.setText("预览生成成功")
+
+    def _on_preview_failed(self, error_msg):
+        self._finish_preview_job()
+        self.status_label.setText(error_msg)
 
     def _start_embed(self):
         """Start embedding subtitles into video."""
         if not self.subtitle_path or not self.video_path:
             return
 
-        if not self.ffmpeg_path:
-            QtWidgets.QMessageBox.warning(self, "错误", "FFmpeg未配置")
+        if not self._validate_ffmpeg():
             return
 
-        video_dir = os.path.dirname(self.video_path)
-        base_name = os.path.splitext(os.path.basename(self.video_path))[0]
-        output_path = os.path.join(video_dir, f"{base_name}_embed.mp4")
-
-        chinese_factor = self.chinese_fontsize.value()
-        other_factor = self.other_fontsize.value()
-        margin = self.margin_spinbox.value() if self.margin_spinbox.value() > 0 else None
-        zh_ass_color = self._get_ass_color(self.zh_color)
-        other_ass_color = self._get_ass_color(self.other_color)
+        videos = list(self.video_paths) or [self.video_path]
 
         self.progress_bar.setValue(0)
         self.progress_bar.setVisible(True)
@@ -364,20 +660,79 @@ class EmbedSubtitlesPage(QtWidgets.QWidget):
         # 我们创建一个临时属性来存储这个临时路径，以便在结束后清理
         self._temp_safe_sub = self._create_safe_temp_file(self.subtitle_path)
 
+        # 读取后台探测的结果，不在点击处理里同步探测；尚未完成时本次用 libx264
+        enc_args = cached_h264_encoder(self.ffmpeg_path, self) if self.hw_encode_check.isChecked() else None
+        margin = self.margin_spinbox.value() if self.margin_spinbox.value() > 0 else None
+        self._embed_params = dict(
+            zh_factor=self.chinese_fontsize.value(),
+            en_factor=self.other_fontsize.value(),
+            margin=margin,
+            zh_col=self._zh_ass_color,
+            en_col=self._other_ass_color,
+            subs=self._current_subs(),
+            enc_args=enc_args,
+        )
+
+        # 多个视频时并行处理：最多用一半的核数个任务，每个任务分到剩余的线程；
+        # 显卡编码器同时能开的会话有限，硬件编码时最多两个任务
+        cpu = os.cpu_count() or 2
+        parallel = max(1, min(len(videos), cpu // 2))
+        if enc_args and enc_args[1] != "libx264":
+            parallel = min(parallel, 2)
+        self._embed_params["threads"] = max(1, cpu // parallel) if len(videos) > 1 else 0
+
+        self._embed_queue = videos
+        self._embed_total = len(videos)
+        self._embed_jobs = {}
+        self._embed_outputs = []
+        self._embed_errors = []
+        for _ in range(parallel):
+            self._start_next_embed()
+
+    def _start_next_embed(self):
+        """从队列取出下一个视频开始嵌入"""
+        if not self._embed_queue:
+            return
+        video_path = self._embed_queue.pop(0)
+        base_name = os.path.splitext(os.path.basename(video_path))[0]
+        output_path = os.path.join(os.path.dirname(video_path), f"{base_name}_embed.mp4")
+
+        embedder = SubtitleEmbedder(self.ffmpeg_path, self.ffprobe_path, self)
+        embedder.progress.connect(lambda value, e=embedder: self._on_job_progress(e, value))
+        embedder.finished.connect(lambda out, e=embedder: self._on_job_done(e, out, None))
+        embedder.error.connect(lambda msg, e=embedder, v=video_path:
+                               self._on_job_done(e, None, f"{os.path.basename(v)}: {msg}"))
+        self._embed_jobs[embedder] = 0
         try:
             # 传入安全路径给 embedder
-            self.embedder.embed(
-                self.video_path,
-                self._temp_safe_sub,  # 使用无特殊字符的路径
-                output_path,
-                chinese_factor,
-                other_factor,
-                margin,
-                zh_ass_color,
-                other_ass_color
-            )
+            embedder.embed(video_path, self._temp_safe_sub, output_path, **self._embed_params)
         except Exception as e:
-            self._on_error(str(e))
+            self._on_job_done(embedder, None, f"{os.path.basename(video_path)}: {e}")
+
+    def _on_job_progress(self, embedder, value):
+        if embedder not in self._embed_jobs:
+            return
+        self._embed_jobs[embedder] = value
+        # 已结束的任务按 100% 计，总进度取平均
+        done = len(self._embed_outputs) + len(self._embed_errors)
+        self._on_progress(int((done * 100 + sum(self._embed_jobs.values())) / self._embed_total))
+
+    def _on_job_done(self, embedder, output_path, error_msg):
+        if self._embed_jobs.pop(embedder, None) is None:
+            return
+        embedder.deleteLater()
+        if output_path:
+            self._embed_outputs.append(output_path)
+        else:
+            self._embed_errors.append(error_msg)
+
+        if self._embed_queue:
+            self._start_next_embed()
+        elif not self._embed_jobs:
+            if not self._embed_outputs:
+                self._on_error("\n".join(self._embed_errors))
+            else:
+                self._on_finished(self._embed_outputs, self._embed_errors)
 
     def file_group_enabled(self, enabled):
         """Enable/disable file selection and parameters during processing."""
@@ -389,46 +744,86 @@ class EmbedSubtitlesPage(QtWidgets.QWidget):
         self.zh_color_btn.setEnabled(enabled)
         self.other_color_btn.setEnabled(enabled)
         self.margin_spinbox.setEnabled(enabled)
+        self.hw_encode_check.setEnabled(enabled)
+
+    def _cleanup_temp_sub(self):
+        """清理嵌入用的临时字幕副本（原文件不删除）"""
+        temp_sub = getattr(self, '_temp_safe_sub', None)
+        if temp_sub and temp_sub != self.subtitle_path:
+            with contextlib.suppress(OSError):
+                os.remove(temp_sub)
 
     def _on_progress(self, value):
+        """记录待刷新的进度，合并高频更新"""
+        self._pending_progress = value
+        if not self._progress_timer.isActive():
+            self._progress_timer.start()
+
+    def _flush_progress(self):
+        """把最新的进度刷新到进度条，没有新进度时停止定时器"""
+        if self._pending_progress is None:
+            self._progress_timer.stop()
+            return
+        value, self._pending_progress = self._pending_progress, None
+        if value == self.progress_bar.value():
+            return
         self.progress_bar.setValue(value)
         self.status_label.setText(f"处理中: {value}%")
 
-    def _on_finished(self, output_path):
+    def _stop_progress(self):
+        self._progress_timer.stop()
+        self._pending_progress = None
+
+    def _on_finished(self, output_paths, errors=()):
+        self._stop_progress()
         self.progress_bar.setValue(100)
         self.status_label.setText("处理完成！")
         self.embed_btn.setEnabled(True)
         self.file_group_enabled(True)
-
-        # 清理临时字幕文件
-        if hasattr(self, '_temp_safe_sub') and os.path.exists(self._temp_safe_sub):
-            try:
-                os.remove(self._temp_safe_sub)
-            except:
-                pass
-
+        self._resume_pending_preview()
+
+        self._cleanup_temp_sub()
+        self._trim_preview_cache()
+        self._embed_params = None
+
+        if len(output_paths) == 1:
+            text = f"字幕嵌入完成！\n输出文件: {output_paths[0]}"
+        else:
+            text = f"字幕嵌入完成！共 {len(output_paths)} 个文件\n输出目录: {os.path.dirname(output_paths[0])}"
+        if errors:
+            text += f"\n\n以下 {len(errors)} 个文件失败:\n" + "\n".join(errors)
         reply = QtWidgets.QMessageBox.question(
             self,
             "完成",
-            f"字幕嵌入完成！\n输出文件: {output_path}\n\n是否打开所在文件夹？",
+            f"{text}\n\n是否打开所在文件夹？",
             QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No
         )
 
         if reply == QtWidgets.QMessageBox.Yes:
-            folder = os.path.dirname(output_path)
-            os.startfile(folder)
+            self._reveal_in_file_manager(output_paths[0])
+
+    def _reveal_in_file_manager(self, path):
+        """在文件管理器中定位输出文件（不经过 shell）"""
+        try:
+            if sys.platform == "win32":
+                # 列表形式会被 list2cmdline 把整个 /select,... 加上引号，explorer 无法识别；
+                # 这里直接给出命令行字符串，只给路径加引号
+                subprocess.Popen(f'explorer /select,"{os.path.normpath(path)}"')
+            elif sys.platform == "darwin":
+                subprocess.Popen(["open", "-R", path])
+            else:
+                QtGui.QDesktopServices.openUrl(QtCore.QUrl.fromLocalFile(os.path.dirname(path)))
+        except Exception as e:
+            self.status_label.setText(f"无法打开文件夹: {e}")
 
     def _on_error(self, error_msg):
+        self._stop_progress()
         self.progress_bar.setVisible(False)
         self.status_label.setText("处理失败")
         self.embed_btn.setEnabled(True)
         self.file_group_enabled(True)
+        self._resume_pending_preview()
 
-        # 清理临时字幕文件
-        if hasattr(self, '_temp_safe_sub') and os.path.exists(self._temp_safe_sub):
-            try:
-                os.remove(self._temp_safe_sub)
-            except:
-                pass
+        self._cleanup_temp_sub()
 
         QtWidgets.QMessageBox.critical(self, "错误", f"嵌入过程出错:\n{error_msg}")
\ No newline at end of file
@@ -1,28 +1,152 @@
 from PyQt5 import QtCore, QtGui, QtWidgets
-from core.workers import VideoDownloadWorker
+from core.workers import VideoDownloadWorker, SubtitleParseWorker, SubtitleSaveWorker
 from typing import Optional, List
+import sys
+import copy
 import time
 import os
+from contextlib import contextmanager
+from functools import lru_cache
 from config.settings import ASR_DICT, TRANS_DICT, DOWNLOAD_VIDEO_DIR, SUB_RESULT_DIR, VIDEO_RESULT_DIR
-import platform
-import srt
 from core.subtitle_editor_logic import (
-    parse_subtitle_file, 
-    save_subtitle_file, 
-    create_backup,
     swap_chinese_english,
     extract_chinese_only,
     extract_other_language_only,
+    display_subtitles,
     format_srt_time,
     parse_srt_time
 )
-from core.subtitle_processor import (
-    SubtitleEmbedder,
-    create_preview_frame,
-    probe_video_size
-)
 
 
+# $HOME 运行期间不会变化，只展开一次
+_COOKIE_PATH = os.path.join(os.path.expanduser("~"), "Downloads", "DVP", "cookies.txt")
+_COOKIE_OK_TPL = "<span style='color:#00b894; font-weight:bold'>✔ 已加载完成 ({}b)</span>"
+_COOKIE_MISSING_HTML = "<span style='color:#d63031'>✘ 需一键导入youtube登录信息 (限制视频可能下载失败)</span>"
+
+# 字幕时间格式化/解析缓存：切换显示模式时间轴不变，重绘时直接查表
+_fmt_time = lru_cache(maxsize=None)(format_srt_time)
+_parse_time = lru_cache(maxsize=4096)(parse_srt_time)
+
+# 单次任务内最多记录的不同步骤数
+_MAX_SEEN_STEPS = 256
+
+# 日志行模板，两个参数时 % 格式化比 f-string 略快
+_LOG_TPL = "[%s] %s"
+
+# 日志时间戳缓存：[秒级时间戳, 格式化结果]，同一秒内的多条日志复用
+_ts_cache = [0, ""]
+
+
+def _now_hms():
+    t = int(time.time())
+    if t != _ts_cache[0]:
+        _ts_cache[0] = t
+        _ts_cache[1] = time.strftime('%H:%M:%S', time.localtime(t))
+    return _ts_cache[1]
+
+
+@contextmanager
+def _signals_blocked(*widgets):
+    """批量修改控件时暂停信号和重绘，结束后统一刷新一次
+
+    只暂停这些控件的最近公共父控件的重绘（不动整个窗口），并恢复原先的状态，可嵌套使用
+    """
+    prev = [w.blockSignals(True) for w in widgets]
+    scope = _common_parent(widgets)
+    paused = scope is not None and scope.updatesEnabled()
+    if paused:
+        scope.setUpdatesEnabled(False)
+    try:
+        yield
+    finally:
+        for w, p in zip(widgets, prev):
+            w.blockSignals(p)
+        if paused:
+            scope.setUpdatesEnabled(True)
+
+
+def _common_parent(widgets):
+    """返回包含全部控件的最近公共父控件（只有一个控件时为它本身）"""
+    if not widgets:
+        return None
+    scope = widgets[0]
+    while scope is not None and not all(w is scope or scope.isAncestorOf(w) for w in widgets[1:]):
+        scope = scope.parentWidget()
+    return scope
+
+
+def _build_ui(page):
+    """关闭重绘执行 setup_ui，结束后统一激活一次布局，避免逐个控件触发几何计算"""
+    page.setUpdatesEnabled(False)
+    try:
+        page.setup_ui()
+    finally:
+        page.setUpdatesEnabled(True)
+        if page.layout() is not None:
+            page.layout().activate()
+
+
+class _LazyUiMixin:
+    """页面首次显示时才创建控件，缩短启动时间；类上声明的信号在此之前即可连接"""
+    _ui_built = False
+
+    def showEvent(self, event):
+        self._ensure_ui()
+        super().showEvent(event)
+
+    def _ensure_ui(self):
+        if not self._ui_built:
+            self._ui_built = True
+            _build_ui(self)
+
+
+def _combo_model(pairs, parent):
+    """把 (显示文本, 数据) 列表一次性填进模型，供 QComboBox.setModel 使用"""
+    model = QtGui.QStandardItemModel(len(pairs), 1, parent)
+    for row, (label, code) in enumerate(pairs):
+        item = QtGui.QStandardItem(label)
+        item.setData(code, QtCore.Qt.UserRole)  # 与 currentData() 默认角色一致
+        model.setItem(row, 0, item)
+    return model
+
+
+class _LogThrottle(QtCore.QObject):
+    """合并高频日志：首条立即显示，50ms 窗口内的后续日志攒起来一次性追加到 QPlainTextEdit"""
+
+    def __init__(self, widget, interval=50):
+        super().__init__(widget)
+        self._widget = widget
+        self._buf = []
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(interval)
+        self._timer.timeout.connect(self._flush)
+
+    def append(self, line):
+        if self._timer.isActive():
+            self._buf.append(line)
+        else:
+            self._widget.appendPlainText(line)
+            self._timer.start()
+
+    def _flush(self):
+        if self._buf:
+            self._widget.appendPlainText("\n".join(self._buf))
+            self._buf.clear()
+            self._timer.start()
+
+    def flush(self):
+        """立即写出缓冲的日志，任务结束时调用，保证最后几行在弹窗前可见"""
+        self._timer.stop()
+        if self._buf:
+            self._widget.appendPlainText("\n".join(self._buf))
+            self._buf.clear()
+
+    def clear(self):
+        self._buf.clear()
+        self._timer.stop()
+        self._widget.clear()
+
 
 class UploadPage(QtWidgets.QWidget):
     """Video upload and translation page."""
@@ -30,7 +154,9 @@ class UploadPage(QtWidgets.QWidget):
 
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.setup_ui()
+        self._last_dir = SUB_RESULT_DIR
+        self._last_step = "就绪"  # 与 stepLab 当前文本保持一致，免去每次从 QLabel 取回字符串
+        _build_ui(self)
 
     def setup_ui(self):
         # Create widgets
@@ -42,21 +168,28 @@ class UploadPage(QtWidgets.QWidget):
 
         # Language selection
         self.langSrc = QtWidgets.QComboBox()
-        for label, code in ASR_DICT:
-            self.langSrc.addItem(label, code)
-        self.langSrc.setCurrentIndex(0)
+        with _signals_blocked(self.langSrc):
+            self.langSrc.setModel(_combo_model(ASR_DICT, self.langSrc))
+            self.langSrc.setCurrentIndex(0)
         self.langSrc.setMaximumWidth(150)  # 缩短下拉框宽度
 
         self.langTgt = QtWidgets.QComboBox()
-        for label, code in TRANS_DICT:
-            self.langTgt.addItem(label, code)
-        self.langTgt.setCurrentIndex(0)
+        with _signals_blocked(self.langTgt):
+            self.langTgt.setModel(_combo_model(TRANS_DICT, self.langTgt))
+            self.langTgt.setCurrentIndex(0)
         self.langTgt.setMaximumWidth(150)  # 缩短下拉框宽度
 
         # Subtitle options
-        self.burnCheck = QtWidgets.QCheckBox("合成硬字幕视频")
-        self.burnCheck.setChecked(True)
-        self.burnCheck.setToolTip("选中：生成带字幕的视频 (耗时)。\n不选中：仅生成 .srt/.ass 字幕文件 (极快)。")
+        # 数据即任务参数 burn_subtitles：True 硬字幕 / "soft" 软字幕 / False 仅字幕文件
+        self.burnMode = QtWidgets.QComboBox()
+        self.burnMode.addItem("合成硬字幕视频", True)
+        self.burnMode.addItem("封装软字幕视频", "soft")
+        self.burnMode.addItem("仅生成字幕文件", False)
+        self.burnMode.setCurrentIndex(0)
+        self.burnMode.setMaximumWidth(150)
+        self.burnMode.setToolTip("硬字幕：字幕画进画面，需要重新编码 (耗时)。\n"
+                                 "软字幕：字幕作为独立轨道封装进 mp4/mkv/mov，不重新编码 (很快)。\n"
+                                 "仅字幕：只生成 .srt/.ass 字幕文件 (极快)。")
 
         # Status and progress
         self.quotaLab = QtWidgets.QLabel("剩余分钟：—")
@@ -64,8 +197,12 @@ class UploadPage(QtWidgets.QWidget):
         self.progress.setRange(0, 100)
         self.stepLab = QtWidgets.QLabel("就绪")
         self._seen_steps = set()
-        self.log = QtWidgets.QTextEdit()
+        # 纯文本日志，最多保留 1000 行，旧行自动丢弃
+        self.log = QtWidgets.QPlainTextEdit()
         self.log.setReadOnly(True)
+        self.log.setMaximumBlockCount(1000)
+        self.log.setUndoRedoEnabled(False)  # 只读日志不需要撤销记录，否则撤销栈随日志无限增长
+        self._logThrottle = _LogThrottle(self.log)
         self.openVideoBtn = QtWidgets.QPushButton("打开双语视频所在位置")
         self.openVideoBtn.setEnabled(False)
         self.openSubsBtn = QtWidgets.QPushButton("打开字幕所在位置")
@@ -82,7 +219,7 @@ class UploadPage(QtWidgets.QWidget):
         form.addRow("视频文件", filew)
         form.addRow("源语言", self.langSrc)
         form.addRow("翻译语言", self.langTgt)
-        form.addRow("生成选项", self.burnCheck)
+        form.addRow("生成选项", self.burnMode)
 
         btns = QtWidgets.QHBoxLayout()
         btns.addWidget(self.startBtn)
@@ -103,28 +240,32 @@ class UploadPage(QtWidgets.QWidget):
         lay.addStretch(1)
 
         # Connect signals
-        self.videoBtn.clicked.connect(self._select_file)
-        self.startBtn.clicked.connect(self._start_task)
+        self.videoBtn.clicked.connect(self._select_file, type=QtCore.Qt.DirectConnection)
+        self.startBtn.clicked.connect(self._start_task, type=QtCore.Qt.DirectConnection)
 
     def _reset_run_ui(self, initial_step="就绪"):
-        self.progress.setValue(0)
-        self.log.clear()
-        self.stepLab.setText(initial_step)
-        if hasattr(self, "_seen_steps"):
+        with _signals_blocked(self.progress, self.log, self.stepLab):
+            self.progress.setValue(0)
+            self._logThrottle.clear()
+            self.stepLab.setText(initial_step)
+            self._last_step = initial_step
             self._seen_steps.clear()
-        self.enableResultButtons(video_ok=False, subs_ok=False)
+            self.enableResultButtons(video_ok=False, subs_ok=False)
 
+    @QtCore.pyqtSlot()
     def _select_file(self):
         file, _ = QtWidgets.QFileDialog.getOpenFileName(
-            self, "选择视频文件", SUB_RESULT_DIR, "视频文件 (*.mp4 *.avi *.mov *.mkv)"
+            self, "选择视频文件", self._last_dir, "视频文件 (*.mp4 *.avi *.mov *.mkv)"
         )
         if file:
+            self._last_dir = os.path.dirname(file)
             self.videoPath.setText(file)
             self.startBtn.setEnabled(True)
             self._reset_run_ui("就绪")
             self.langSrc.setEnabled(True)
             self.langTgt.setEnabled(True)
 
+    @QtCore.pyqtSlot()
     def _start_task(self):
         self._reset_run_ui("开始任务…")
         self.langSrc.setEnabled(False)
@@ -153,23 +294,39 @@ class UploadPage(QtWidgets.QWidget):
             "video_path": vp,
             "lang_src": lang_src,
             "lang_tgt": lang_tgt,
-            "burn_subtitles": self.burnCheck.isChecked()
+            "burn_subtitles": self.burnMode.currentData()
         }
         self.start_task.emit(params)
 
+    @QtCore.pyqtSlot(int)
     def setProgress(self, value: int):
+        if value == self.progress.value():
+            return
         self.progress.setValue(value)
 
+    @QtCore.pyqtSlot(str)
     def setStep(self, text: str):
+        # 与当前步骤相同（轮询时常见）直接跳过，不触碰控件和日志
+        if text == self._last_step:
+            return
+        self._last_step = text
         self.stepLab.setText(text)
-        if not hasattr(self, "_seen_steps"):
-            self._seen_steps = set()
+        # 步骤名反复出现，驻留后集合查找多为指针比较
+        text = sys.intern(text)
         if text not in self._seen_steps:
+            # 每次任务开始会清空；防止单次长任务里动态步骤文本无限累积
+            if len(self._seen_steps) >= _MAX_SEEN_STEPS:
+                self._seen_steps.clear()
             self._seen_steps.add(text)
             self._log(text)
 
+    @QtCore.pyqtSlot(str)
     def _log(self, text: str):
-        self.log.append(f"[{time.strftime('%H:%M:%S')}] {text}")
+        self._logThrottle.append(_LOG_TPL % (_now_hms(), text))
+
+    def flush_log(self):
+        """立即写出缓冲的日志，任务结束或失败时由主窗口调用"""
+        self._logThrottle.flush()
 
     def setQuota(self, minutes: Optional[int]):
         if minutes is None:
@@ -178,25 +335,28 @@ class UploadPage(QtWidgets.QWidget):
             self.quotaLab.setText(f"剩余分钟：{minutes}")
 
     def enableResultButtons(self, video_ok: bool, subs_ok: bool):
-        self.openVideoBtn.setEnabled(video_ok)
-        self.openSubsBtn.setEnabled(subs_ok)
+        # 状态未变时不调用 setEnabled，省去 changeEvent 和重绘
+        if self.openVideoBtn.isEnabledTo(self) != video_ok:
+            self.openVideoBtn.setEnabled(video_ok)
+        if self.openSubsBtn.isEnabledTo(self) != subs_ok:
+            self.openSubsBtn.setEnabled(subs_ok)
 
 
-class DownloadPage(QtWidgets.QWidget):
+class DownloadPage(_LazyUiMixin, QtWidgets.QWidget):
     """Video download page."""
     start_download = QtCore.pyqtSignal(str)
+    sync_cookies = QtCore.pyqtSignal()
 
     def __init__(self, ffmpeg_path="", parent=None):
         super().__init__(parent)
         self.ffmpeg_path = ffmpeg_path
-        self.setup_ui()
 
     def setup_ui(self):
         # 使URL输入框具有占位符文本
         self.url_input = QtWidgets.QLineEdit()
         self.url_input.setPlaceholderText("在此粘贴视频链接 (YouTube, Bilibili, Twitter 等...)")
         self.download_btn = QtWidgets.QPushButton("下载视频")
-        self.download_btn.clicked.connect(self._start_download)
+        self.download_btn.clicked.connect(self._start_download, type=QtCore.Qt.DirectConnection)
 
         # Cookie状态标签
         self.cookie_label = QtWidgets.QLabel()
@@ -205,12 +365,13 @@ class DownloadPage(QtWidgets.QWidget):
         self.sync_btn = QtWidgets.QPushButton("一键导入登录(youtube)")
         self.sync_btn.setObjectName("flatBtn")
         self.sync_btn.setToolTip("依次尝试从 Edge, Firefox 提取登录信息")
+        self.sync_btn.clicked.connect(self.sync_cookies)
 
         self.delete_btn = QtWidgets.QPushButton("删除")
         self.delete_btn.setObjectName("dangerBtn")
         self.delete_btn.setMaximumWidth(60)
         self.delete_btn.setToolTip("删除现有无效的 Cookies 文件")
-        self.delete_btn.clicked.connect(self._delete_cookies)
+        self.delete_btn.clicked.connect(self._delete_cookies, type=QtCore.Qt.DirectConnection)
 
         # 进度条和状态标签
         self.progress_bar = QtWidgets.QProgressBar()
@@ -218,13 +379,28 @@ class DownloadPage(QtWidgets.QWidget):
         self.status_label = QtWidgets.QLabel("就绪")
 
         # 日志显示区域
-        self.log_display = QtWidgets.QTextEdit()
+        self.log_display = QtWidgets.QPlainTextEdit()
         self.log_display.setReadOnly(True)
+        self.log_display.setMaximumBlockCount(1000)
+        self.log_display.setUndoRedoEnabled(False)
+        self._logThrottle = _LogThrottle(self.log_display)
+
+        # 下载进度先记下，由定时器统一刷新到进度条
+        self._pending_progress = None
+        self._progressTimer = QtCore.QTimer(self)
+        self._progressTimer.setInterval(33)  # 约 30Hz
+        self._progressTimer.timeout.connect(self._flush_progress)
+
+        # Cookie 文件可能被同步流程在外部写入：页面可见时每 500ms 检查一次
+        self._last_cookie_html = None
+        self._cookieTimer = QtCore.QTimer(self)
+        self._cookieTimer.setInterval(500)
+        self._cookieTimer.timeout.connect(self._refresh_cookie_status)
 
         # 打开目录按钮
         self.open_folder_btn = QtWidgets.QPushButton("打开下载目录")
         self.open_folder_btn.setObjectName("flatBtn")
-        self.open_folder_btn.clicked.connect(self._open_download_dir)
+        self.open_folder_btn.clicked.connect(self._open_download_dir, type=QtCore.Qt.DirectConnection)
 
         # 布局设置
         form_layout = QtWidgets.QFormLayout()
@@ -263,17 +439,28 @@ class DownloadPage(QtWidgets.QWidget):
 
     def _refresh_cookie_status(self):
         """刷新Cookie状态显示"""
-        import os
-        work_dir = os.path.join(os.path.expanduser("~"), "Downloads", "DVP")
-        c_path = os.path.join(work_dir, "cookies.txt")
-        if os.path.exists(c_path) and os.path.getsize(c_path) > 0:
-            size = os.path.getsize(c_path)
-            self.cookie_label.setText(f"<span style='color:#00b894; font-weight:bold'>✔ 已加载完成 ({size}b)</span>")
-            self.delete_btn.setEnabled(True)
-        else:
-            self.cookie_label.setText("<span style='color:#d63031'>✘ 需一键导入youtube登录信息 (限制视频可能下载失败)</span>")
-            self.delete_btn.setEnabled(False)
+        try:
+            size = os.stat(_COOKIE_PATH).st_size
+        except OSError:
+            size = 0
+        html = _COOKIE_OK_TPL.format(size) if size > 0 else _COOKIE_MISSING_HTML
+        # 状态未变时直接返回，避免 QLabel 重新解析富文本和重新布局
+        if html == self._last_cookie_html:
+            return
+        self._last_cookie_html = html
+        self.cookie_label.setText(html)
+        self.delete_btn.setEnabled(size > 0)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self._refresh_cookie_status()
+        self._cookieTimer.start()
+
+    def hideEvent(self, event):
+        self._cookieTimer.stop()
+        super().hideEvent(event)
 
+    @QtCore.pyqtSlot()
     def _start_download(self):
         """开始下载视频"""
         url = self.url_input.text().strip()
@@ -281,11 +468,11 @@ class DownloadPage(QtWidgets.QWidget):
             QtWidgets.QMessageBox.warning(self, "提示", "请输入链接")
             return
         self.download_btn.setEnabled(False)
-        self.progress_bar.setValue(0)
-        self.log_display.clear()
+        self.reset_progress()
         self._log("准备开始下载...")
         self.start_download.emit(url)
 
+    @QtCore.pyqtSlot()
     def _delete_cookies(self):
         """删除Cookie文件"""
         reply = QtWidgets.QMessageBox.question(
@@ -298,26 +485,133 @@ class DownloadPage(QtWidgets.QWidget):
             self._refresh_cookie_status()
             QtWidgets.QMessageBox.information(self, "完成", "已删除旧的凭证，请重新点击同步。")
 
+    @QtCore.pyqtSlot()
     def _open_download_dir(self):
         """打开下载目录"""
-        if platform.system() == "Windows":
-            os.startfile(DOWNLOAD_VIDEO_DIR)
-        elif platform.system() == "Darwin":  # macOS
-            os.system(f"open '{DOWNLOAD_VIDEO_DIR}'")
-        else:  # Linux
-            os.system(f"xdg-open '{DOWNLOAD_VIDEO_DIR}'")
+        QtGui.QDesktopServices.openUrl(QtCore.QUrl.fromLocalFile(os.path.abspath(DOWNLOAD_VIDEO_DIR)))
 
+    @QtCore.pyqtSlot(str)
     def _log(self, text: str):
         """添加日志信息"""
-        import time
-        self.log_display.append(f"[{time.strftime('%H:%M:%S')}] {text}")
+        self._logThrottle.append(_LOG_TPL % (_now_hms(), text))
+
+    def flush_log(self):
+        """立即写出缓冲的日志"""
+        self._logThrottle.flush()
+
+    def reset_progress(self):
+        """新任务开始前清空进度和日志"""
+        self._pending_progress = None
+        self._progressTimer.stop()
+        with _signals_blocked(self.progress_bar, self.log_display):
+            self.progress_bar.setValue(0)
+            self._logThrottle.clear()
 
+    @QtCore.pyqtSlot(int)
     def set_progress(self, value: int):
-        """设置进度条值"""
+        """设置进度条值（合并高频更新）"""
+        self._pending_progress = value
+        if not self._progressTimer.isActive():
+            self._progressTimer.start()
+
+    def _flush_progress(self):
+        """把最新的进度刷新到进度条，没有新进度时停止定时器"""
+        if self._pending_progress is None:
+            self._progressTimer.stop()
+            return
+        value, self._pending_progress = self._pending_progress, None
         self.progress_bar.setValue(value)
 
 
-class SubtitleEditorPage(QtWidgets.QWidget):
+# 显示模式 -> 状态栏文字
+_DISPLAY_MODES = {
+    "chinese_up": "中文在上",
+    "other_up": "其他语言在上",
+    "chinese_only": "仅中文",
+    "other_only": "仅其他语言",
+}
+
+
+class SubtitleTableModel(QtCore.QAbstractTableModel):
+    """字幕编辑表格的数据模型，编辑结果直接写回字幕列表"""
+    HEADERS = ("序号", "开始时间", "结束时间", "字幕内容1", "字幕内容2")
+    invalid_time = QtCore.pyqtSignal(int, str)  # 行号（从 0 开始）, 输入的文本
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._subs = []
+
+    def set_subtitles(self, subtitles):
+        self.beginResetModel()
+        self._subs = subtitles
+        self.endResetModel()
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self._subs)
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if orientation == QtCore.Qt.Horizontal and role == QtCore.Qt.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def flags(self, index):
+        flags = super().flags(index)
+        if index.column() > 0:  # 序号不可编辑
+            flags |= QtCore.Qt.ItemIsEditable
+        return flags
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if role not in (QtCore.Qt.DisplayRole, QtCore.Qt.EditRole) or not index.isValid():
+            return None
+        sub = self._subs[index.row()]
+        col = index.column()
+        if col == 0:
+            return str(sub.index)
+        if col == 1:
+            return _fmt_time(sub.start)
+        if col == 2:
+            return _fmt_time(sub.end)
+        # 字幕内容（分两行）
+        lines = sub.content.split('\n', 1)
+        if col == 3:
+            return lines[0]
+        return lines[1] if len(lines) > 1 else ""
+
+    def setData(self, index, value, role=QtCore.Qt.EditRole):
+        if role != QtCore.Qt.EditRole or not index.isValid():
+            return False
+        sub = self._subs[index.row()]
+        col = index.column()
+        if col in (1, 2):
+            try:
+                td = _parse_time(value)
+            except ValueError:
+                # 时间格式错误，保留原值并通知页面提示用户
+                self.invalid_time.emit(index.row(), str(value))
+                return False
+            if col == 1:
+                sub.start = td
+            else:
+                sub.end = td
+        elif col in (3, 4):
+            lines = sub.content.split('\n', 1)
+            content1 = lines[0]
+            content2 = lines[1] if len(lines) > 1 else ""
+            if col == 3:
+                content1 = value
+            else:
+                content2 = value
+            sub.content = content1 + '\n' + content2 if content2 else content1
+        else:
+            return False
+        self.dataChanged.emit(index, index, [role])
+        return True
+
+
+class SubtitleEditorPage(_LazyUiMixin, QtWidgets.QWidget):
     """Subtitle editor page for editing subtitle files."""
     
     def __init__(self, parent=None):
@@ -325,8 +619,15 @@ class SubtitleEditorPage(QtWidgets.QWidget):
         self.current_file = None
         self.current_format = None
         self.subtitles = []
-        self.original_subtitles = []  # 保存原始字幕数据
-        self.setup_ui()
+        self._original_snapshot = ()  # 原始字幕数据：序号/开始/结束/内容四个平行元组
+        self._parse_worker = None
+        self._save_worker = None
+        # 显示模式切换去抖：快速滚动下拉框时只处理最后一次选择
+        self._last_mode = None
+        self._mode_timer = QtCore.QTimer(self)
+        self._mode_timer.setSingleShot(True)
+        self._mode_timer.setInterval(50)
+        self._mode_timer.timeout.connect(self._apply_display_mode)
     
     def setup_ui(self):
         # 文件选择区域
@@ -335,16 +636,18 @@ class SubtitleEditorPage(QtWidgets.QWidget):
         self.file_input.setReadOnly(True)
         
         self.select_file_btn = QtWidgets.QPushButton("选择字幕文件")
-        self.select_file_btn.clicked.connect(self._select_subtitle_file)
+        self.select_file_btn.clicked.connect(self._select_subtitle_file, type=QtCore.Qt.DirectConnection)
         
         file_layout = QtWidgets.QHBoxLayout()
         file_layout.addWidget(self.file_input)
         file_layout.addWidget(self.select_file_btn)
         
         # 表格显示区域
-        self.table = QtWidgets.QTableWidget()
-        self.table.setColumnCount(5)
-        self.table.setHorizontalHeaderLabels(["序号", "开始时间", "结束时间", "字幕内容1", "字幕内容2"])
+        # 模型直接引用 self.subtitles，视图只为可见行取数据
+        self.model = SubtitleTableModel(self)
+        self.model.invalid_time.connect(self._on_invalid_time)
+        self.table = QtWidgets.QTableView()
+        self.table.setModel(self.model)
         
         # 设置表格美化选项
         self.table.setAlternatingRowColors(True)  # 交替行颜色
@@ -380,14 +683,14 @@ class SubtitleEditorPage(QtWidgets.QWidget):
         
         # 自定义样式：文本选中颜色 + 确保编辑器文字完全可见
         self.table.setStyleSheet("""
-            QTableWidget QLineEdit {
+            QTableView QLineEdit {
                 selection-background-color: #B3D9FF;  /* 柔和的淡蓝色 */
                 selection-color: #000000;  /* 黑色文字 */
                 padding: 4px;  /* 内边距 */
                 border: 1px solid #64B5F6;  /* 边框 */
                 background-color: white;  /* 编辑时白色背景 */
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 5px;  /* 单元格内边距 */
             }
         """)
@@ -419,7 +722,7 @@ class SubtitleEditorPage(QtWidgets.QWidget):
         self.format_combo.setMaximumWidth(150)
         
         self.save_btn = QtWidgets.QPushButton("保存文件")
-        self.save_btn.clicked.connect(self._save_file)
+        self.save_btn.clicked.connect(self._save_file, type=QtCore.Qt.DirectConnection)
         self.save_btn.setEnabled(False)
         self.save_btn.setMaximumWidth(100)
         
@@ -456,15 +759,42 @@ class SubtitleEditorPage(QtWidgets.QWidget):
             self._load_subtitle_file(file)
     
     def _load_subtitle_file(self, filepath: str):
-        """加载字幕文件"""
+        """加载字幕文件（解析和深拷贝在后台线程完成）"""
+        self.select_file_btn.setEnabled(False)
+        self.status_label.setText("加载中…")
+        worker = SubtitleParseWorker(filepath, self)
+        worker.finished.connect(
+            lambda subs, fmt, original, w=worker, p=filepath: self._on_subtitle_parsed(w, p, subs, fmt, original)
+        )
+        worker.error.connect(lambda msg, w=worker: self._on_subtitle_parse_failed(w, msg))
+        self._parse_worker = worker
+        worker.start()
+
+    def _release_parse_worker(self, worker):
+        worker.wait()
+        worker.deleteLater()
+        if worker is self._parse_worker:
+            self._parse_worker = None
+        self.select_file_btn.setEnabled(True)
+
+    def _on_subtitle_parse_failed(self, worker, msg):
+        self._release_parse_worker(worker)
+        QtWidgets.QMessageBox.critical(self, "加载失败", f"无法加载字幕文件:\n{msg}")
+        self.status_label.setText("加载失败")
+
+    def _on_subtitle_parsed(self, worker, filepath, subtitles, fmt, original):
+        """后台解析完成，在界面线程填充数据"""
+        self._release_parse_worker(worker)
+        _fmt_time.cache_clear()  # 换文件后旧时间戳不会再用到
         try:
-            self.subtitles, self.current_format = parse_subtitle_file(filepath)
+            self.subtitles, self.current_format = subtitles, fmt
             self.current_file = filepath
             self.file_input.setText(filepath)
             
-            # 保存原始字幕数据（深拷贝）
-            import copy
-            self.original_subtitles = copy.deepcopy(self.subtitles)
+            # 原始字幕数据（不可变平行元组，切换模式时据此生成）
+            self._original_snapshot = original
+            self._last_mode = None
+            self._mode_timer.stop()
             
             # 重置显示模式为默认的“中文在上”
             self.process_combo.blockSignals(True)  # 阻止触发信号
@@ -486,63 +816,38 @@ class SubtitleEditorPage(QtWidgets.QWidget):
             QtWidgets.QMessageBox.critical(self, "加载失败", f"无法加载字幕文件:\n{str(e)}")
             self.status_label.setText("加载失败")
     
+    def _on_invalid_time(self, row, text):
+        self.status_label.setText(f"第 {row + 1} 行时间格式错误: {text}（应为 00:00:01,500），已保留原值")
+
     def _update_table(self):
         """更新表格显示"""
-        self.table.setRowCount(len(self.subtitles))
-        
-        for i, sub in enumerate(self.subtitles):
-            # 序号
-            seq_item = QtWidgets.QTableWidgetItem(str(sub.index))
-            seq_item.setFlags(seq_item.flags() & ~QtCore.Qt.ItemIsEditable)  # 序号不可编辑
-            self.table.setItem(i, 0, seq_item)
-            
-            # 开始时间
-            start_item = QtWidgets.QTableWidgetItem(format_srt_time(sub.start))
-            self.table.setItem(i, 1, start_item)
-            
-            # 结束时间
-            end_item = QtWidgets.QTableWidgetItem(format_srt_time(sub.end))
-            self.table.setItem(i, 2, end_item)
-            
-            # 字幕内容（分两行）
-            content_lines = sub.content.split('\n', 1)
-            content1 = content_lines[0] if len(content_lines) > 0 else ""
-            content2 = content_lines[1] if len(content_lines) > 1 else ""
-            
-            self.table.setItem(i, 3, QtWidgets.QTableWidgetItem(content1))
-            self.table.setItem(i, 4, QtWidgets.QTableWidgetItem(content2))
+        self.model.set_subtitles(self.subtitles)
     
     def _on_display_mode_changed(self):
-        """显示模式改变时动态更新显示"""
-        if not self.original_subtitles:
+        """显示模式改变时延迟处理，合并连续切换"""
+        self._mode_timer.start()
+
+    def _apply_display_mode(self):
+        """按当前显示模式重新生成字幕显示"""
+        if not self._original_snapshot or not self._original_snapshot[0]:
+            return
+        
+        # 获取处理选项；与上次已应用的模式相同则无需重算
+        process_option = self.process_combo.currentData()
+        if process_option == self._last_mode:
+            return
+        
+        mode_text = _DISPLAY_MODES.get(process_option)
+        if mode_text is None:
             return
         
         try:
-            # 从原始数据开始处理
-            import copy
-            temp_subtitles = copy.deepcopy(self.original_subtitles)
-            
-            # 获取处理选项
-            process_option = self.process_combo.currentData()
-            
-            # 根据选项调用不同的处理函数
-            if process_option == "chinese_up":
-                self.subtitles = swap_chinese_english(temp_subtitles, True)
-                mode_text = "中文在上"
-            elif process_option == "other_up":
-                self.subtitles = swap_chinese_english(temp_subtitles, False)
-                mode_text = "其他语言在上"
-            elif process_option == "chinese_only":
-                self.subtitles = extract_chinese_only(temp_subtitles)
-                mode_text = "仅中文"
-            elif process_option == "other_only":
-                self.subtitles = extract_other_language_only(temp_subtitles)
-                mode_text = "仅其他语言"
-            else:
-                return
+            # 直接从原始快照按模式生成，不必先重建整份字幕再逐条处理
+            self.subtitles = display_subtitles(self._original_snapshot, process_option)
             
             # 更新表格显示
             self._update_table()
+            self._last_mode = process_option
             
             self.status_label.setText(f"显示模式：{mode_text}")
             
@@ -556,9 +861,6 @@ class SubtitleEditorPage(QtWidgets.QWidget):
             return
         
         try:
-            # 先从表格读取当前的编辑内容
-            self._read_table_to_subtitles()
-            
             # 获取处理选项
             process_option = self.process_combo.currentData()
             
@@ -586,88 +888,72 @@ class SubtitleEditorPage(QtWidgets.QWidget):
         except Exception as e:
             QtWidgets.QMessageBox.critical(self, "处理失败", f"处理字幕时出错:\n{str(e)}")
     
-    def _read_table_to_subtitles(self):
-        """从表格读取内容到字幕列表"""
-        for i in range(self.table.rowCount()):
-            try:
-                # 读取时间
-                start_str = self.table.item(i, 1).text()
-                end_str = self.table.item(i, 2).text()
-                
-                # 解析时间
-                start = parse_srt_time(start_str)
-                end = parse_srt_time(end_str)
-                
-                # 读取内容
-                content1 = self.table.item(i, 3).text() if self.table.item(i, 3) else ""
-                content2 = self.table.item(i, 4).text() if self.table.item(i, 4) else ""
-                
-                # 组合内容
-                if content2:
-                    content = content1 + '\n' + content2
-                else:
-                    content = content1
-                
-                # 更新字幕对象
-                self.subtitles[i].start = start
-                self.subtitles[i].end = end
-                self.subtitles[i].content = content
-                
-            except Exception as e:
-                raise Exception(f"第 {i+1} 行数据格式错误: {str(e)}")
-    
     def _save_file(self):
-        """保存文件"""
+        """保存文件（备份和写盘在后台线程完成）"""
         if not self.subtitles or not self.current_file:
             QtWidgets.QMessageBox.warning(self, "提示", "没有可保存的内容")
             return
         
-        try:
-            # 从表格读取最新的编辑内容
-            self._read_table_to_subtitles()
-            
-            # 获取保存格式
-            save_format = self.format_combo.currentData()
-            
-            # 创建备份
-            try:
-                backup_path = create_backup(self.current_file)
-                self.status_label.setText(f"已创建备份: {os.path.basename(backup_path)}")
-            except Exception as e:
-                reply = QtWidgets.QMessageBox.question(
-                    self,
-                    "备份失败",
-                    f"无法创建备份文件:\n{str(e)}\n\n是否继续保存？",
-                    QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No
-                )
-                if reply != QtWidgets.QMessageBox.Yes:
-                    return
-            
-            # 确定保存路径
-            base_path = os.path.splitext(self.current_file)[0]
-            save_path = f"{base_path}.{save_format}"
-            
-            # 保存文件
-            save_subtitle_file(self.subtitles, save_path, save_format)
-            
-            QtWidgets.QMessageBox.information(
-                self, 
-                "保存成功", 
-                f"字幕已保存为 {save_format.upper()} 格式:\n{save_path}"
-            )
-            self.status_label.setText(f"已保存: {os.path.basename(save_path)}")
-            
-        except Exception as e:
-            QtWidgets.QMessageBox.critical(self, "保存失败", f"保存字幕文件时出错:\n{str(e)}")
+        # 获取保存格式，确定保存路径
+        save_format = self.format_combo.currentData()
+        base_path = os.path.splitext(self.current_file)[0]
+        self._start_save(f"{base_path}.{save_format}", save_format, backup=True)
+    
+    def _start_save(self, save_path: str, save_format: str, backup: bool):
+        self.save_btn.setEnabled(False)
+        self.status_label.setText("保存中…")
+        # 交给后台的是浅拷贝，保存期间继续编辑表格不会影响正在写出的内容
+        subtitles = [copy.copy(sub) for sub in self.subtitles]
+        worker = SubtitleSaveWorker(subtitles, self.current_file, save_path, save_format, backup, self)
+        worker.finished.connect(lambda path, backup_path, w=worker: self._on_save_done(w, path, backup_path))
+        worker.error.connect(
+            lambda msg, in_backup, w=worker, p=save_path, f=save_format: self._on_save_failed(w, p, f, msg, in_backup)
+        )
+        self._save_worker = worker
+        worker.start()
+    
+    def _release_save_worker(self, worker):
+        worker.wait()
+        worker.deleteLater()
+        if worker is self._save_worker:
+            self._save_worker = None
+        self.save_btn.setEnabled(True)
+    
+    def _on_save_done(self, worker, save_path, backup_path):
+        self._release_save_worker(worker)
+        save_format = os.path.splitext(save_path)[1][1:]
+        QtWidgets.QMessageBox.information(
+            self, 
+            "保存成功", 
+            f"字幕已保存为 {save_format.upper()} 格式:\n{save_path}"
+        )
+        self.status_label.setText(f"已保存: {os.path.basename(save_path)}")
+    
+    def _on_save_failed(self, worker, save_path, save_format, msg, in_backup):
+        self._release_save_worker(worker)
+        if not in_backup:
+            QtWidgets.QMessageBox.critical(self, "保存失败", f"保存字幕文件时出错:\n{msg}")
+            self.status_label.setText("保存失败")
+            return
+        reply = QtWidgets.QMessageBox.question(
+            self,
+            "备份失败",
+            f"无法创建备份文件:\n{msg}\n\n是否继续保存？",
+            QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No
+        )
+        if reply == QtWidgets.QMessageBox.Yes:
+            self._start_save(save_path, save_format, backup=False)
+        else:
+            self.status_label.setText("已取消保存")
 
 
-class BillingPage(QtWidgets.QWidget):
+class BillingPage(_LazyUiMixin, QtWidgets.QWidget):
     """Billing and minutes purchase page."""
     purchase_minutes = QtCore.pyqtSignal(int)
 
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.setup_ui()
+        self._user = None
 
     def setup_ui(self):
         self.balance_label = QtWidgets.QLabel("剩余分钟数: --")
@@ -679,7 +965,7 @@ class BillingPage(QtWidgets.QWidget):
         self.minutes_spin.setSingleStep(10)
         self.minutes_spin.setValue(60)
         self.purchase_btn = QtWidgets.QPushButton("购买分钟")
-        self.purchase_btn.clicked.connect(self._purchase)
+        self.purchase_btn.clicked.connect(self._purchase, type=QtCore.Qt.DirectConnection)
 
         # 使用QFormLayout排列购买分钟数相关控件
         form_layout = QtWidgets.QFormLayout(purchase_group)
@@ -693,27 +979,33 @@ class BillingPage(QtWidgets.QWidget):
 
         # 添加stretch将控件推到顶部
         layout.addStretch(1)
+        self._apply_user()
 
+    @QtCore.pyqtSlot()
     def _purchase(self):
         minutes = self.minutes_spin.value()
         self.purchase_minutes.emit(minutes)
 
     def set_user(self, user):
         """设置用户信息并更新余额显示"""
-        if user is None:
+        self._user = user
+        if self._ui_built:
+            self._apply_user()
+
+    def _apply_user(self):
+        if self._user is None:
             self.balance_label.setText("剩余分钟数: --")
         else:
-            self.balance_label.setText(f"剩余分钟数: {user.minutes_left}")
+            self.balance_label.setText(f"剩余分钟数: {self._user.minutes_left}")
 
 
-class SettingsPage(QtWidgets.QWidget):
+class SettingsPage(_LazyUiMixin, QtWidgets.QWidget):
     """Application settings page."""
     settings_changed = QtCore.pyqtSignal()
 
     def __init__(self, config, parent=None):
         super().__init__(parent)
         self.config = config
-        self.setup_ui()
 
     def setup_ui(self):
         self.ffmpeg_input = QtWidgets.QLineEdit()
@@ -737,12 +1029,12 @@ class SettingsPage(QtWidgets.QWidget):
 
         # 保存按钮
         self.save_btn = QtWidgets.QPushButton("保存设置")
-        self.save_btn.clicked.connect(self._save_settings)
+        self.save_btn.clicked.connect(self._save_settings, type=QtCore.Qt.DirectConnection)
         layout.addWidget(self.save_btn)
 
         # 恢复更新提醒按钮
         self.reset_update_btn = QtWidgets.QPushButton("恢复更新提醒")
-        self.reset_update_btn.clicked.connect(self._reset_update_reminder)
+        self.reset_update_btn.clicked.connect(self._reset_update_reminder, type=QtCore.Qt.DirectConnection)
         layout.addWidget(self.reset_update_btn)
 
         # 添加stretch将控件推到顶部
@@ -760,6 +1052,7 @@ class SettingsPage(QtWidgets.QWidget):
         if directory:
             self.workdir_input.setText(directory)
 
+    @QtCore.pyqtSlot()
     def _save_settings(self):
         self.config["ffmpeg_path"] = self.ffmpeg_input.text()
         self.config["work_dir"] = self.workdir_input.text()